@@ -31,10 +31,12 @@ class RateLimiter:
     - Each request consumes one token
     - If no tokens available, wait until one is available
     - Burst allows multiple requests in quick succession
+    - With tokens_per_minute, a second bucket (holding up to one minute of
+      tokens) is charged with each request's estimated LLM token count
     
     Args:
         requests_per_minute: Maximum requests per minute
-        tokens_per_minute: Optional token-based rate limiting (for future use)
+        tokens_per_minute: Optional maximum LLM tokens per minute
         burst: Maximum burst size (default: 1)
     
     Example:
@@ -43,6 +45,10 @@ class RateLimiter:
         
         # Async usage
         await limiter.acquire_async()
+        
+        # Token budget: charge an estimated prompt size per request
+        limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=200000)
+        await limiter.acquire_async(tokens=len(prompt) // 4)
     """
     requests_per_minute: int
     tokens_per_minute: Optional[int] = None
@@ -50,6 +56,7 @@ class RateLimiter:
     
     # Internal state
     _tokens: float = field(default=None, init=False, repr=False)
+    _token_budget: float = field(default=None, init=False, repr=False)
     _last_update: float = field(default=None, init=False, repr=False)
     _lock: asyncio.Lock = field(default=None, init=False, repr=False)
     
@@ -61,6 +68,7 @@ class RateLimiter:
     def __post_init__(self):
         """Initialize internal state."""
         self._tokens = float(self.burst)
+        self._token_budget = float(self.tokens_per_minute or 0)
         self._last_update = time.monotonic()
         self._lock = asyncio.Lock()
         
@@ -82,42 +90,64 @@ class RateLimiter:
         now = self._get_time()
         elapsed = now - self._last_update
         self._tokens = min(self.burst, self._tokens + elapsed * self._rate)
+        if self.tokens_per_minute:
+            self._token_budget = min(
+                self.tokens_per_minute,
+                self._token_budget + elapsed * self.tokens_per_minute / 60.0
+            )
         self._last_update = now
     
-    def _wait_time(self) -> float:
-        """Calculate time to wait for next token."""
-        if self._tokens >= 1.0:
-            return 0.0
-        return (1.0 - self._tokens) / self._rate
+    def _wait_time(self, tokens: int = 0) -> float:
+        """Calculate time to wait for next token (and the token budget)."""
+        wait = 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self._rate
+        if self.tokens_per_minute and tokens:
+            # A request larger than the whole bucket waits for a full bucket
+            needed = min(tokens, self.tokens_per_minute)
+            if self._token_budget < needed:
+                wait = max(wait, (needed - self._token_budget) * 60.0 / self.tokens_per_minute)
+        return wait
+    
+    def _consume(self, tokens: int) -> None:
+        self._tokens -= 1.0
+        if self.tokens_per_minute:
+            self._token_budget -= tokens
     
-    def acquire(self) -> None:
+    def acquire(self, tokens: int = 0) -> None:
         """Acquire a token, blocking if necessary.
         
         This is the synchronous version. Use acquire_async() for async code.
+        
+        Args:
+            tokens: Estimated LLM tokens for the request, charged against
+                tokens_per_minute when it is set
         """
         self._refill()
         
-        wait = self._wait_time()
+        wait = self._wait_time(tokens)
         if wait > 0:
             self._sleep(wait)
             self._refill()
         
-        self._tokens -= 1.0
+        self._consume(tokens)
     
-    async def acquire_async(self) -> None:
+    async def acquire_async(self, tokens: int = 0) -> None:
         """Acquire a token asynchronously, waiting if necessary.
         
         This is the async version. Use acquire() for sync code.
+        
+        Args:
+            tokens: Estimated LLM tokens for the request, charged against
+                tokens_per_minute when it is set
         """
         async with self._lock:
             self._refill()
             
-            wait = self._wait_time()
+            wait = self._wait_time(tokens)
             if wait > 0:
                 await self._async_sleep(wait)
                 self._refill()
             
-            self._tokens -= 1.0
+            self._consume(tokens)
     
     def try_acquire(self) -> bool:
         """Try to acquire a token without blocking.
@@ -135,6 +165,7 @@ class RateLimiter:
     def reset(self) -> None:
         """Reset the rate limiter to initial state."""
         self._tokens = float(self.burst)
+        self._token_budget = float(self.tokens_per_minute or 0)
         self._last_update = self._get_time()
     
     @property
@@ -144,4 +175,9 @@ class RateLimiter:
         return self._tokens
     
     def __repr__(self) -> str:
+        if self.tokens_per_minute:
+            return (
+                f"RateLimiter(rpm={self.requests_per_minute}, "
+                f"tpm={self.tokens_per_minute}, burst={self.burst})"
+            )
         return f"RateLimiter(rpm={self.requests_per_minute}, burst={self.burst})"
@@ -39,6 +39,9 @@ def __getattr__(name):
     if name == "Memory":
         from .memory import Memory
         return Memory
+    if name == "CacheMiss":
+        from .memory import CacheMiss
+        return CacheMiss
     if name == "AutoMemory":
         from .auto_memory import AutoMemory
         return AutoMemory
@@ -117,6 +120,7 @@ __all__ = [
     # Core memory
     "FileMemory", 
     "Memory", 
+    "CacheMiss",
     "create_memory",
     # Rules management
     "RulesManager", 
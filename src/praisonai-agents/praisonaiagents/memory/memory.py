@@ -1,9 +1,20 @@
 import os
+import asyncio
 import sqlite3
 import json
 import time
 import shutil
-from typing import Any, Dict, List, Optional, Union, Literal
+import struct
+import hashlib
+import operator
+import queue
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union, Literal
 import logging
 from datetime import datetime
 
@@ -57,7 +68,521 @@ try:
 except ImportError:
     PYMONGO_AVAILABLE = False
 
+try:
+    import sqlite_vec
+    SQLITE_VEC_AVAILABLE = True
+except ImportError:
+    SQLITE_VEC_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from usearch.index import Index as USearchIndex, MetricKind, ScalarKind
+    USEARCH_AVAILABLE = True
+except ImportError:
+    USEARCH_AVAILABLE = False
+
+
+# Applied once to every persistent SQLite connection, readers included
+_SQLITE_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+)
+# Applied to the writer only, since read-only connections cannot change the
+# journal mode: WAL lets readers run alongside the writer and
+# synchronous=NORMAL defers fsync to checkpoints.
+_SQLITE_WRITER_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+)
+
+
+def _sqlite_supports(*statements: str) -> bool:
+    """Whether the linked SQLite library runs statements, tried on a scratch DB."""
+    conn = sqlite3.connect(":memory:")
+    try:
+        for statement in statements:
+            conn.execute(statement)
+        return True
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+
+# JSON1 is built in from SQLite 3.38 and generated columns need 3.31; without
+# them metadata filters fall back to json_extract on meta (see _sql_filter),
+# served by _json_extract when JSON1 itself is missing.
+_SQLITE_JSON1 = _sqlite_supports("SELECT json_extract('{}', '$.a')")
+_SQLITE_GENERATED_COLUMNS = _SQLITE_JSON1 and _sqlite_supports(
+    "CREATE TABLE t (meta TEXT, a GENERATED ALWAYS AS (json_extract(meta, '$.a')) VIRTUAL)",
+    "CREATE INDEX t_a ON t(a)",
+)
+
+
+def _json_extract(doc: Optional[str], path: str) -> Any:
+    """Python json_extract for SQLite builds without JSON1; top-level "$.key" paths only."""
+    if doc is None:
+        return None
+    key = path[2:]
+    if key.startswith('"'):
+        key = json.loads(key)
+    obj = json.loads(doc)
+    value = obj.get(key) if isinstance(obj, dict) else None
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+# Inputs per embeddings API request (OpenAI's limit)
+_EMBEDDING_BATCH_SIZE = 2048
+# Bound parameters per "IN (...)" lookup
+_SQLITE_IN_CHUNK = 500
+
+
+def _pack_f32(vec: List[float]) -> bytes:
+    """Pack an embedding as little-endian float32 bytes (sqlite-vec wire format)."""
+    return struct.pack(f"<{len(vec)}f", *vec)
+
+
+def _unpack_f32(blob: bytes) -> List[float]:
+    """Inverse of _pack_f32."""
+    return list(struct.unpack(f"<{len(blob) // 4}f", blob))
+
+
+# Storage formats for persisted embeddings ("embedding_quantization" config)
+_EMBEDDING_DTYPES = ("float32", "float16", "int8")
+
+
+def _quantize_int8(vec: List[float]) -> Tuple[bytes, float]:
+    """Symmetric scalar quantization to int8; returns (packed int8 values, scale)."""
+    scale = max(abs(x) for x in vec) / 127 or 1.0
+    return struct.pack(f"<{len(vec)}b", *(round(x / scale) for x in vec)), scale
+
+
+def _encode_embedding(vec: List[float], dtype: str) -> bytes:
+    """
+    Pack an embedding for storage: float32 (4 B/dim), float16 (2 B/dim) or
+    int8 (1 B/dim, prefixed with its float32 scale).
+    """
+    if dtype == "int8":
+        packed, scale = _quantize_int8(vec)
+        return struct.pack("<f", scale) + packed
+    if dtype == "float16":
+        return struct.pack(f"<{len(vec)}e", *vec)
+    return _pack_f32(vec)
+
+
+def _decode_embedding(blob: bytes, dtype: str) -> List[float]:
+    """Inverse of _encode_embedding."""
+    if dtype == "int8":
+        (scale,) = struct.unpack_from("<f", blob)
+        return [x * scale for x in struct.unpack_from(f"<{len(blob) - 4}b", blob, 4)]
+    if dtype == "float16":
+        return list(struct.unpack(f"<{len(blob) // 2}e", blob))
+    return _unpack_f32(blob)
+
+# Default memory DB, and the per-tier files it replaced
+_DEFAULT_DB = ".praison/memory.db"
+_LEGACY_SHORT_DB = ".praison/short_term.db"
+_LEGACY_LONG_DB = ".praison/long_term.db"
+
+_RAG_BACKENDS = ("chroma", "usearch")
+_HNSW_DEFAULTS = {"space": "cosine", "M": 16, "construction_ef": 128, "search_ef": 64}
+
+# JSON codec for metadata, judge replies and cached metrics: orjson when
+# installed, else the stdlib. Dumps returns str either way so meta stays TEXT
+# and json_extract keeps working on it.
+if ORJSON_AVAILABLE:
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            return json.dumps(obj)  # e.g. ints beyond 64 bits
+else:
+    _loads = json.loads
+    _dumps = json.dumps
+
+
+# Deletes every character str.isspace() accepts (all are below U+3001)
+_WS_TRANS = str.maketrans("", "", "".join(c for c in map(chr, range(0x3001)) if c.isspace()))
+
+
+# Memory ids are 63-bit nanosecond timestamps: INTEGER PRIMARY KEY (the rowid)
+# in SQLite, and 16-char hex strings everywhere else (results, Chroma, MongoDB).
+_IDENT_MASK = 0x7FFF_FFFF_FFFF_FFFF
+
+
+def _hex_id(ident: int) -> str:
+    return f"{ident:016x}"
+
+
+def _int_id(ident: str) -> int:
+    return int(ident, 16)
+
+
+# Metadata value types ChromaDB accepts as-is; anything else is stored as str()
+_PRIMS = (str, int, float, bool)
+_PRIM_SET = frozenset(_PRIMS)
+
+# Metadata keys exposed as indexed generated columns, with their SQL types
+_INDEXED_META = {
+    "short_mem": {"quality": "REAL"},
+    "long_mem": {"category": "TEXT", "user_id": "TEXT", "quality": "REAL"},
+}
+# Comparison operators accepted in metadata filters as {key: {op: value}};
+# a plain {key: value} means equality
+_FILTER_OPS = {"eq": "=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+_FILTER_CHECKS = {
+    "eq": operator.eq, "gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le,
+}
+# Nearest neighbours fetched per requested hit when a filter is applied after KNN
+_FILTER_OVERFETCH = 10
+
+# How calculate_quality_metrics uses the judge cache: "enabled" reads and
+# writes it, "read-only" serves hits but never stores, "write-only" always
+# calls the LLM and stores the result (e.g. to refresh entries), "replay"
+# only reads and raises CacheMiss on a miss (no API calls), "disabled"
+# bypasses it
+_JUDGE_CACHE_MODES = ("enabled", "read-only", "write-only", "replay", "disabled")
+_JUDGE_CACHE_READS = frozenset(("enabled", "read-only", "replay"))
+_JUDGE_CACHE_WRITES = frozenset(("enabled", "write-only"))
+
+
+# Greedy, seeded judge sampling so repeated prompts score the same and can be
+# served from the judge cache; both values are part of the cache key.
+# nondeterministic=True calls sample at _JUDGE_SAMPLING_TEMPERATURE instead.
+_JUDGE_TEMPERATURE = 0
+_JUDGE_SEED = 0
+_JUDGE_SAMPLING_TEMPERATURE = 0.3
+# (output, expected_output) pairs scored per LLM request by calculate_quality_metrics_batch
+_JUDGE_BATCH_SIZE = 8
+
+# search_with_quality result cache: entries kept, and seconds each stays fresh
+_SEARCH_CACHE_MAX = 256
+_SEARCH_CACHE_TTL = 5.0
+# Result count from which search_with_quality filters scores with a NumPy mask
+_NUMPY_FILTER_MIN = 64
+# Metric names every judge reply must contain
+_REQUIRED_METRICS = frozenset(("completeness", "relevance", "clarity", "accuracy"))
+# Scores reported when the judge cannot be reached or replies unusably; a
+# read-only template, copied per call since callers get a plain dict
+_ZERO_METRICS: Mapping[str, float] = MappingProxyType(
+    {"completeness": 0.0, "relevance": 0.0, "clarity": 0.0, "accuracy": 0.0}
+)
+# Shared read-only stand-in for results without metadata
+_NO_METADATA: Mapping[str, Any] = MappingProxyType({})
+
+
+def _copy_hits(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy search hits and their metadata dicts, so callers cannot edit cached results."""
+    return [
+        dict(hit, metadata=dict(hit["metadata"])) if isinstance(hit.get("metadata"), dict) else dict(hit)
+        for hit in hits
+    ]
+
+
+# Default calculate_quality_metrics prompt, formatted with expected= and output=
+_DEFAULT_EVAL_TEMPLATE = """
+        Evaluate the following output against expected output.
+        Score each metric from 0.0 to 1.0:
+        - Completeness: Does it address all requirements?
+        - Relevance: Does it match expected output?
+        - Clarity: Is it clear and well-structured?
+        - Accuracy: Is it factually correct?
+
+        Expected: {expected}
+        Actual: {output}
+
+        Return ONLY a JSON with these keys: completeness, relevance, clarity, accuracy
+        Example: {{"completeness": 0.95, "relevance": 0.8, "clarity": 0.9, "accuracy": 0.85}}
+        """
+
+
+_BATCH_EVAL_TEMPLATE = """
+        Evaluate each of the {count} numbered pairs below, comparing the actual output against the expected output.
+        Score each metric from 0.0 to 1.0:
+        - Completeness: Does it address all requirements?
+        - Relevance: Does it match expected output?
+        - Clarity: Is it clear and well-structured?
+        - Accuracy: Is it factually correct?
+
+        {pairs}
+        Return ONLY a JSON object with a "results" list holding one entry per pair, in order.
+        Each entry has these keys: completeness, relevance, clarity, accuracy
+        Example for two pairs: {{"results": [{{"completeness": 0.95, "relevance": 0.8, "clarity": 0.9, "accuracy": 0.85}}, {{"completeness": 0.6, "relevance": 0.7, "clarity": 0.8, "accuracy": 0.9}}]}}
+        """
+
+
+def _judge_sampling(nondeterministic: bool) -> Dict[str, Any]:
+    """Sampling parameters for a judge request."""
+    if nondeterministic:
+        return {"temperature": _JUDGE_SAMPLING_TEMPERATURE}
+    return {"temperature": _JUDGE_TEMPERATURE, "seed": _JUDGE_SEED}
+
+
+def _close_partial_json(text: str) -> Optional[str]:
+    """
+    Cut a streamed JSON document back to its last complete value (the last
+    ',' or closing bracket outside a string) and close any open objects and
+    arrays, so json.loads accepts it. A trailing value that may still grow
+    (e.g. 0.8 before 0.85) is dropped. Returns None if nothing is complete yet.
+    """
+    closers: List[str] = []
+    in_string = escaped = False
+    cut = None
+    cut_closers = ""
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            closers.append("}")
+        elif ch == "[":
+            closers.append("]")
+        elif ch in "}]" and closers:
+            closers.pop()
+            cut, cut_closers = i + 1, "".join(reversed(closers))
+        elif ch == ",":
+            cut, cut_closers = i, "".join(reversed(closers))
+    if cut is None:
+        return None
+    return text[:cut] + cut_closers
+
+
+def _stream_checkpoint(buffer: List[str], delta: str) -> Optional[Any]:
+    """Decode the complete part of a streamed judge reply after a chunk that may end a value."""
+    if "," not in delta and "}" not in delta and "]" not in delta:
+        return None
+    closed = _close_partial_json("".join(buffer))
+    if closed is None:
+        return None
+    try:
+        return _loads(closed)
+    except ValueError:
+        return None
+
+
+def _has_metrics(reply: Any) -> bool:
+    """True once a judge reply holds a numeric score for every metric."""
+    return isinstance(reply, dict) and all(
+        isinstance(reply.get(k), (int, float)) for k in _REQUIRED_METRICS
+    )
+
+
+def _has_batch_metrics(reply: Any, count: int) -> bool:
+    results = reply.get("results") if isinstance(reply, dict) else None
+    return isinstance(results, list) and len(results) == count and all(map(_has_metrics, results))
+
+
+class CacheMiss(LookupError):
+    """Raised in judge cache "replay" mode when a prompt has no cached metrics."""
+
+
+def _filter_terms(where: Optional[Dict[str, Any]]) -> Iterator[Tuple[str, str, Any]]:
+    """Flatten metadata filters into (key, op, value) terms."""
+    for key, cond in (where or {}).items():
+        if isinstance(cond, dict):
+            for op, value in cond.items():
+                if op not in _FILTER_OPS:
+                    raise ValueError(f"Unsupported filter operator {op!r} for {key!r}; use one of {tuple(_FILTER_OPS)}")
+                yield key, op, value
+        else:
+            yield key, "eq", cond
+
+
+def _with_min_quality(where: Optional[Dict[str, Any]], min_quality: float) -> Optional[Dict[str, Any]]:
+    """Add quality >= min_quality to filters; like the old 0.0 default, unscored rows then fail."""
+    if min_quality <= 0 or (where and "quality" in where):
+        return where
+    return {**(where or {}), "quality": {"gte": min_quality}}
+
 
+def _sql_filter(
+    where: Optional[Dict[str, Any]], table: str = "long_mem", alias: str = ""
+) -> Tuple[str, List[Any]]:
+    """
+    Translate metadata filters on a memory table into an AND clause (without
+    a leading AND) and its parameters. Keys in _INDEXED_META use their
+    indexed column, others (and all keys when the SQLite build lacks
+    generated columns) json_extract.
+    """
+    indexed = _INDEXED_META[table] if _SQLITE_GENERATED_COLUMNS else {}
+    clauses, params = [], []
+    for key, op, value in _filter_terms(where):
+        if key in indexed:
+            clauses.append(f"{alias}{key} {_FILTER_OPS[op]} ?")
+        else:
+            clauses.append(f"json_extract({alias}meta, ?) {_FILTER_OPS[op]} ?")
+            params.append("$." + json.dumps(key))
+        params.append(value)
+    return " AND ".join(clauses), params
+
+
+def _mongo_where(where: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Translate metadata filters into a MongoDB query on the metadata subdocument."""
+    query: Dict[str, Any] = {}
+    for key, op, value in _filter_terms(where):
+        if op == "eq":
+            query[f"metadata.{key}"] = value
+        else:
+            query.setdefault(f"metadata.{key}", {})[f"${op}"] = value
+    return query
+
+
+def _chroma_where(where: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Translate metadata filters into a Chroma where clause."""
+    clauses = [
+        {key: value} if op == "eq" else {key: {f"${op}": value}}
+        for key, op, value in _filter_terms(where)
+    ]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _meta_matches(metadata: Optional[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> bool:
+    """Python-side check of the same filters, for backends that cannot take them."""
+    metadata = metadata or {}
+    for key, op, value in _filter_terms(where):
+        actual = metadata.get(key)
+        if op == "eq":
+            if actual != value:
+                return False
+            continue
+        try:
+            if actual is None or not _FILTER_CHECKS[op](actual, value):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+class _ChromaVectorStore:
+    """Vector store adapter over a ChromaDB collection, which keeps its own documents."""
+
+    stores_documents = True
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict], embeddings: List[List[float]]):
+        self.collection.add(documents=texts, metadatas=metadatas, ids=ids, embeddings=embeddings)
+
+    def query(
+        self, embedding: List[float], k: int, where: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, str, Dict, float]]:
+        """Return (id, text, metadata, cosine distance) for the k nearest entries matching where."""
+        resp = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            where=_chroma_where(where),
+            include=["documents", "metadatas", "distances"]
+        )
+        if not resp["ids"]:
+            return []
+        return list(zip(
+            # Entries added before ids became hex used the decimal timestamp
+            [_hex_id(int(i)) if len(i) != 16 and i.isdigit() else i for i in resp["ids"][0]],
+            resp["documents"][0],
+            resp["metadatas"][0] if resp.get("metadatas") else [{}] * len(resp["ids"][0]),
+            resp["distances"][0] if resp.get("distances") else [0.0] * len(resp["ids"][0])
+        ))
+
+    def save(self):
+        pass  # PersistentClient writes through
+
+
+class _USearchVectorStore:
+    """
+    Vector store adapter over a USearch HNSW index persisted to a single file.
+    Only vectors live in the index, keyed by the integer memory id; text and
+    metadata are joined back from long_mem through ``lookup``.
+    """
+
+    stores_documents = False
+
+    def __init__(
+        self,
+        path: str,
+        dims: int,
+        lookup,
+        quantization: str = "float32",
+        connectivity: int = 16,
+        expansion_add: int = 64,
+        expansion_search: int = 64
+    ):
+        self.path = path
+        self.lookup = lookup
+        scalar = {"float32": ScalarKind.F32, "float16": ScalarKind.F16, "int8": ScalarKind.I8}[quantization]
+        self.index = USearchIndex(
+            ndim=dims,
+            metric=MetricKind.Cos,
+            dtype=scalar,
+            connectivity=connectivity,
+            expansion_add=expansion_add,
+            expansion_search=expansion_search
+        )
+        if os.path.exists(path):
+            self.index.load(path)
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict], embeddings: List[List[float]]):
+        self.index.add(
+            np.asarray([_int_id(ident) for ident in ids], dtype=np.uint64),
+            np.asarray(embeddings, dtype=np.float32)
+        )
+
+    def missing(self, ids: List[str]) -> List[str]:
+        """Ids not yet in the index, e.g. stored after the last save."""
+        if not ids:
+            return []
+        present = self.index.contains(np.asarray([_int_id(ident) for ident in ids], dtype=np.uint64))
+        return [ident for ident, found in zip(ids, present) if not found]
+
+    def query(
+        self, embedding: List[float], k: int, where: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, str, Dict, float]]:
+        """
+        Return (id, text, metadata, cosine distance) for the k nearest entries
+        matching where. Filtered queries over-fetch neighbours and apply the
+        filter in the SQLite lookup.
+        """
+        if len(self.index) == 0:
+            return []
+        matches = self.index.search(
+            np.asarray(embedding, dtype=np.float32), k * _FILTER_OVERFETCH if where else k
+        )
+        ids = [_hex_id(int(key)) for key in matches.keys]
+        docs = self.lookup(ids, where)
+        return [
+            (ident, *docs[ident], float(distance))
+            for ident, distance in zip(ids, matches.distances) if ident in docs
+        ][:k]
+
+    def save(self):
+        self.index.save(self.path)
+
+    def reset(self):
+        self.index.reset()
+        if os.path.exists(self.path):
+            os.remove(self.path)
 
 
 class Memory:
@@ -74,10 +599,19 @@ class Memory:
     Config example:
     {
       "provider": "rag" or "mem0" or "mongodb" or "none",
-      "use_embedding": True,
-      "short_db": "short_term.db",
+      "use_embedding": True,     # with sqlite-vec installed, enables KNN search in the SQLite store
+      "embedding_quantization": "int8",  # optional: "float32" (default), "float16" or "int8" storage
+      "db": "memory.db",         # SQLite file for short-term, long-term and cached embeddings
+                                 # (default .praison/memory.db, or memory.db next to long_db/short_db)
+      "read_pool_size": 8,       # optional: pooled read connections, default min(32, CPUs + 4)
+      "short_db": "short_term.db",  # legacy per-tier files, imported into "db" once if present
       "long_db": "long_term.db",
       "rag_db_path": "rag_db",   # optional path for local embedding store
+      "rag_backend": "usearch",  # optional: "chroma" (default) or "usearch" HNSW index for large stores
+      "hnsw": {"M": 32, "construction_ef": 128, "search_ef": 64},  # optional HNSW tuning, see below
+      "judge_cache_mode": "replay",  # optional: "enabled" (default), "read-only", "write-only", "replay" or "disabled"
+      "judge_rate_limiter": RateLimiter(requests_per_minute=500, tokens_per_minute=200000),  # optional judge throttle
+      "judge_stats_window": 1024,  # optional: judge latencies kept for get_judge_stats
       "config": {
         "api_key": "...",       # if mem0 usage
         "org_id": "...",
@@ -120,6 +654,33 @@ class Memory:
     
     Note: Graph memory requires "mem0ai[graph]" installation and works alongside 
     vector-based memory for enhanced relationship-aware retrieval.
+
+    HNSW tuning (fixed when the Chroma collection or USearch index is created,
+    except that USearch re-applies search_ef each time the index is opened):
+    "M" is the number of graph links per vector; memory grows linearly with it
+    and 16 suits most stores, 32-48 helps recall on large corpora.
+    "construction_ef" is the candidate list size while inserting; higher builds
+    a better graph at slower ingest. "search_ef" is the candidate list size per
+    query; raise it for recall, lower it for latency. Defaults: M=16,
+    construction_ef=128, search_ef=64, space="cosine" (Chroma only).
+    """
+
+    # Fixed SQL text so each connection's statement cache reuses the prepared statement
+    _SQL_SEARCH_STM = "SELECT id, content, meta FROM short_mem WHERE content LIKE ? {filter} LIMIT ?"
+    _SQL_SEARCH_LTM = "SELECT id, content, meta, created_at FROM long_mem WHERE content LIKE ? {filter} LIMIT ?"
+    _SQL_ALL_STM = "SELECT id, content, meta, created_at FROM short_mem"
+    _SQL_ALL_LTM = "SELECT id, content, meta, created_at FROM long_mem"
+    # Up to N LIKE matches per tier, in the same order as the per-tier searches
+    _SQL_SEARCH_COMBINED = """
+    SELECT tier, id, content, meta, created_at FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY tier ORDER BY id) AS rn FROM (
+            SELECT 'short_term' AS tier, id, content, meta, created_at FROM short_mem WHERE content LIKE ?1
+            UNION ALL
+            SELECT 'long_term' AS tier, id, content, meta, created_at FROM long_mem WHERE content LIKE ?1
+        )
+    )
+    WHERE rn <= ?2
+    ORDER BY tier = 'long_term', id
     """
 
     def __init__(self, config: Dict[str, Any], verbose: int = 0):
@@ -143,7 +704,21 @@ class Memory:
             
         self.provider = self.cfg.get("provider", "rag")
         self.use_mem0 = (self.provider.lower() == "mem0") and MEM0_AVAILABLE
-        self.use_rag = (self.provider.lower() == "rag") and CHROMADB_AVAILABLE and self.cfg.get("use_embedding", False)
+        self.rag_backend = self.cfg.get("rag_backend", "chroma")
+        if self.rag_backend not in _RAG_BACKENDS:
+            raise ValueError(f"rag_backend must be one of {_RAG_BACKENDS}, got {self.rag_backend!r}")
+        rag_available = (
+            USEARCH_AVAILABLE and NUMPY_AVAILABLE if self.rag_backend == "usearch" else CHROMADB_AVAILABLE
+        )
+        self.use_rag = (self.provider.lower() == "rag") and rag_available and self.cfg.get("use_embedding", False)
+        if self.provider.lower() == "rag" and self.rag_backend == "usearch" and not rag_available:
+            logger.warning(
+                'rag_backend="usearch" needs usearch and numpy; install them with '
+                'pip install "praisonaiagents[usearch]". Falling back to SQLite search.'
+            )
+        # Vector store adapter for the "rag" provider (see _init_chroma / _init_usearch)
+        self._vec = None
+        self.hnsw_config = {**_HNSW_DEFAULTS, **(self.cfg.get("hnsw") or {})}
         self.use_mongodb = (self.provider.lower() == "mongodb") and PYMONGO_AVAILABLE
         self.graph_enabled = False  # Initialize graph support flag
         
@@ -155,70 +730,377 @@ class Memory:
         else:
             self.embedding_model = "text-embedding-3-small"
         
-        self._log_verbose(f"Using embedding model: {self.embedding_model}")
+        self._log_verbose("Using embedding model: %s", self.embedding_model)
 
         # Determine embedding dimensions based on model
         self.embedding_dimensions = self._get_embedding_dimensions(self.embedding_model)
-        self._log_verbose(f"Using embedding dimensions: {self.embedding_dimensions}")
+        self._log_verbose("Using embedding dimensions: %s", self.embedding_dimensions)
+
+        # Storage format for cached and sqlite-vec embeddings
+        self.embedding_quantization = self.cfg.get("embedding_quantization") or "float32"
+        if self.embedding_quantization not in _EMBEDDING_DTYPES:
+            raise ValueError(
+                f"embedding_quantization must be one of {_EMBEDDING_DTYPES}, "
+                f"got {self.embedding_quantization!r}"
+            )
+        # sqlite-vec tables whose embedding column is int8
+        self._vec_int8_tables = set()
+
+        # Rank SQLite results by embedding when SQLite is the primary store:
+        # sqlite-vec KNN if the extension loads, else NumPy brute-force cosine
+        self.use_sqlite_embeddings = (
+            self.cfg.get("use_embedding", False)
+            and not (self.use_rag or self.use_mem0 or self.use_mongodb)
+        )
+        self.use_sqlite_vec = SQLITE_VEC_AVAILABLE and self.use_sqlite_embeddings
+        # Lazily loaded (row-normalized (N, D) matrix, ids) per table for NumPy search
+        self._emb_matrices: Dict[str, Tuple[Any, List[str]]] = {}
+        # The ids in each loaded matrix, so a row loaded by a search racing its
+        # store is not appended a second time
+        self._emb_ids: Dict[str, set] = {}
+        self._matrix_lock = threading.Lock()
 
         # Create .praison directory if it doesn't exist
         os.makedirs(".praison", exist_ok=True)
+        self._last_ident = 0
+        # One writer connection per DB, serialized by this lock; searches use
+        # a pool of read-only connections so they can run concurrently. All
+        # tiers share the pool, so it is sized like a default thread pool
+        # rather than for build_context_for_task's four searches alone.
+        self._rw_lock = threading.Lock()
+        self._read_pool_size = self.cfg.get("read_pool_size", min(32, (os.cpu_count() or 1) + 4))
+        # The reader each thread currently holds, handed back to nested borrows
+        self._held_reader = threading.local()
+        # In-memory LRU in front of the persistent emb_cache table
+        self._emb_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._emb_cache_size = self.cfg.get("embedding_cache_size", 1024)
+        self._emb_lock = threading.Lock()
+        # Shared OpenAI client so its HTTP connections are reused across calls
+        self._openai = None
+        self._async_openai = None
+        self._openai_lock = threading.Lock()
+        # calculate_quality_metrics results keyed by sha256(model, temperature,
+        # seed, prompt), in memory and in the judge_cache table
+        self.judge_cache_mode = self.cfg.get("judge_cache_mode", "enabled")
+        if self.judge_cache_mode not in _JUDGE_CACHE_MODES:
+            raise ValueError(
+                f"judge_cache_mode must be one of {_JUDGE_CACHE_MODES}, got {self.judge_cache_mode!r}"
+            )
+        self._judge_cache: "OrderedDict[bytes, Dict[str, float]]" = OrderedDict()
+        self._judge_cache_size = self.cfg.get("judge_cache_size", 1024)
+        self._judge_lock = threading.Lock()
+        # Judge cache hits/misses, request latencies (most recent
+        # judge_stats_window) and token counts; see get_judge_stats
+        self.judge_stats: Dict[str, Any] = {
+            "hits": 0,
+            "misses": 0,
+            "latency_ms": deque(maxlen=self.cfg.get("judge_stats_window", 1024)),
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+        # Optional praisonaiagents.llm.RateLimiter applied before every judge request
+        self._judge_limiter = self.cfg.get("judge_rate_limiter")
+        # Recent search_with_quality results, cleared when any store or reset
+        # starts; the generation counter keeps searches already running then
+        # from caching their results
+        self._search_cache: "OrderedDict[tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._search_cache_size = self.cfg.get("search_cache_size", _SEARCH_CACHE_MAX)
+        self._search_cache_ttl = self.cfg.get("search_cache_ttl", _SEARCH_CACHE_TTL)
+        self._search_gen = 0
+        self._search_lock = threading.Lock()
+
+        # One SQLite file holds short_mem, long_mem, emb_cache and judge_cache;
+        # configs that only set the legacy short_db/long_db keep their directory
+        self.db = self.cfg.get("db")
+        if self.db is None:
+            legacy_db = self.cfg.get("long_db") or self.cfg.get("short_db")
+            if legacy_db is None:
+                self.db = _DEFAULT_DB
+            elif legacy_db == ":memory:":
+                self.db = ":memory:"
+            else:
+                self.db = os.path.join(os.path.dirname(legacy_db), "memory.db")
+        self._init_db()
 
-        # Short-term DB
-        self.short_db = self.cfg.get("short_db", ".praison/short_term.db")
-        self._init_stm()
-
-        # Long-term DB
-        self.long_db = self.cfg.get("long_db", ".praison/long_term.db")
-        self._init_ltm()
+        # Decided after init since loading sqlite-vec may have failed
+        self.use_numpy_search = NUMPY_AVAILABLE and self.use_sqlite_embeddings and not self.use_sqlite_vec
 
         # Conditionally init Mem0, MongoDB, or local RAG
         if self.use_mem0:
             self._init_mem0()
         elif self.use_mongodb:
             self._init_mongodb()
+        elif self.use_rag and self.rag_backend == "usearch":
+            self._init_usearch()
         elif self.use_rag:
             self._init_chroma()
 
-    def _log_verbose(self, msg: str, level: int = logging.INFO):
-        """Only log if verbose >= 5"""
+        # memory_type -> bound method, for store_quality and search_with_quality;
+        # any other memory_type uses long-term memory
+        self._store_dispatch = {"short": self.store_short_term, "long": self.store_long_term}
+        self._search_dispatch = {"short": self.search_short_term, "long": self.search_long_term}
+
+    def _log_verbose(self, msg: str, *args: Any, level: int = logging.INFO):
+        """Only log if verbose >= 5; msg is %-formatted with args lazily, like logger calls."""
         if self.verbose >= 5:
-            logger.log(level, msg)
+            logger.log(level, msg, *args)
 
     # -------------------------------------------------------------------------
     #                          Initialization
     # -------------------------------------------------------------------------
-    def _init_stm(self):
-        """Creates or verifies short-term memory table."""
-        os.makedirs(os.path.dirname(self.short_db) or ".", exist_ok=True)
-        conn = sqlite3.connect(self.short_db)
-        c = conn.cursor()
-        c.execute("""
-        CREATE TABLE IF NOT EXISTS short_mem (
-            id TEXT PRIMARY KEY,
-            content TEXT,
-            meta TEXT,
-            created_at REAL
-        )
-        """)
-        conn.commit()
-        conn.close()
+    def _connect(self, db_path: str, readonly: bool = False) -> sqlite3.Connection:
+        """
+        Open a persistent autocommit SQLite connection with WAL and tuned PRAGMAs,
+        loading sqlite-vec when vector search is enabled.
+        """
+        if readonly:
+            uri = f"{Path(db_path).absolute().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+            for pragma in _SQLITE_WRITER_PRAGMAS:
+                conn.execute(pragma)
+        for pragma in _SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        if not _SQLITE_JSON1:
+            conn.create_function("json_extract", 2, _json_extract, deterministic=True)
+        if self.use_sqlite_vec:
+            try:
+                conn.enable_load_extension(True)
+                sqlite_vec.load(conn)
+                conn.enable_load_extension(False)
+            except (AttributeError, sqlite3.Error) as e:
+                # e.g. Python builds without loadable extension support
+                self._log_verbose("Could not load sqlite-vec, using LIKE search: %s", e, level=logging.WARNING)
+                self.use_sqlite_vec = False
+        return conn
+
+    def _open_read_pool(self, db_path: str, writer: sqlite3.Connection) -> queue.Queue:
+        """Pre-populate a pool of read-only connections to db_path."""
+        pool = queue.Queue()
+        if db_path == ":memory:":
+            # A private in-memory DB is only reachable through its writer
+            pool.put(writer)
+            return pool
+        for _ in range(self._read_pool_size):
+            pool.put(self._connect(db_path, readonly=True))
+        return pool
+
+    @contextmanager
+    def _reader(self, pool: queue.Queue) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read-only connection from a pool. A thread that already holds
+        one gets the same connection back, so nested reads never wait on the
+        pool (with ":memory:" its only entry is the writer).
+        """
+        held = getattr(self._held_reader, "conn", None)
+        if held is not None:
+            yield held
+            return
+        conn = pool.get()
+        self._held_reader.conn = conn
+        try:
+            yield conn
+        finally:
+            self._held_reader.conn = None
+            pool.put(conn)
+
+    @contextmanager
+    def _txn(self, conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed statements in a single BEGIN...COMMIT transaction on the writer."""
+        with self._rw_lock:
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        """Persist the vector index and close the writer and pooled reader SQLite connections."""
+        if self._vec is not None:
+            try:
+                self._vec.save()
+            except Exception as e:
+                logger.error(f"Error saving vector index: {e}")
+        pool = getattr(self, "_pool", None)
+        while pool is not None and not pool.empty():
+            pool.get_nowait().close()
+        if getattr(self, "_conn", None) is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _new_ident(self) -> str:
+        """Hex nanosecond-timestamp id, bumped when called faster than the clock ticks."""
+        with self._rw_lock:
+            ident = max(time.time_ns() & _IDENT_MASK, self._last_ident + 1)
+            self._last_ident = ident
+        return _hex_id(ident)
+
+    def _init_vec_table(self, conn: sqlite3.Connection, table: str):
+        """Creates the sqlite-vec table holding one embedding per memory row."""
+        element = "int8" if self.embedding_quantization == "int8" else "float"
+        try:
+            conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING vec0("
+                f"embedding {element}[{self.embedding_dimensions}] distance_metric=cosine)"
+            )
+            # An existing table keeps the element type it was created with
+            sql = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = ?", (table,)
+            ).fetchone()[0]
+            if "int8[" in sql:
+                self._vec_int8_tables.add(table)
+        except sqlite3.Error as e:
+            self._log_verbose("Could not create sqlite-vec table %s: %s", table, e, level=logging.WARNING)
+            self.use_sqlite_vec = False
+
+    def _migrate_text_ids(self, conn: sqlite3.Connection, table: str):
+        """Rebuild a table created with TEXT ids so its ids become the integer rowid."""
+        cols = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if cols.get("id", "").upper() != "TEXT":
+            return
+        copied = ", ".join(col for col in ("content", "meta", "created_at", "emb") if col in cols)
+        self._log_verbose("Migrating %s to integer ids", table)
+        with self._txn(conn):
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+            conn.execute(f"""
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY,
+                content TEXT,
+                meta TEXT,
+                created_at REAL{", emb BLOB" if "emb" in cols else ""}
+            )
+            """)
+            # Non-numeric legacy ids get a fresh rowid
+            conn.execute(
+                f"INSERT INTO {table} (id, {copied}) "
+                f"SELECT CASE WHEN id NOT GLOB '*[^0-9]*' AND id != '' THEN CAST(id AS INTEGER) END, {copied} "
+                f"FROM {table}_old"
+            )
+            conn.execute(f"DROP TABLE {table}_old")
+
+    def _init_db(self):
+        """Creates or verifies the short-term, long-term, embedding and judge cache tables."""
+        os.makedirs(os.path.dirname(self.db) or ".", exist_ok=True)
+        self._conn = self._connect(self.db)
+        for table in ("short_mem", "long_mem"):
+            self._migrate_text_ids(self._conn, table)
+
+        with self._txn(self._conn) as conn:
+            for table in ("short_mem", "long_mem"):
+                conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id INTEGER PRIMARY KEY,
+                    content TEXT,
+                    meta TEXT,
+                    created_at REAL
+                )
+                """)
+                cols = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+                if "emb" not in cols:
+                    # Packed float32 embedding per row, used for NumPy cosine ranking
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN emb BLOB")
+                # Indexed generated columns so entity/user/quality filters run in SQL
+                indexed = _INDEXED_META[table] if _SQLITE_GENERATED_COLUMNS else {}
+                for key, sql_type in indexed.items():
+                    if key not in cols:
+                        conn.execute(
+                            f"ALTER TABLE {table} ADD COLUMN {key} {sql_type} "
+                            f"GENERATED ALWAYS AS (json_extract(meta, '$.{key}')) VIRTUAL"
+                        )
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{key} ON {table}({key})")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS emb_cache (
+                hash BLOB PRIMARY KEY,
+                model TEXT,
+                vec BLOB,
+                dtype TEXT DEFAULT 'float32'
+            )
+            """)
+            cache_cols = {row[1] for row in conn.execute("PRAGMA table_info(emb_cache)")}
+            if "dtype" not in cache_cols:
+                conn.execute("ALTER TABLE emb_cache ADD COLUMN dtype TEXT DEFAULT 'float32'")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS judge_cache (
+                hash BLOB PRIMARY KEY,
+                model TEXT,
+                metrics TEXT,
+                created_at REAL
+            )
+            """)
 
-    def _init_ltm(self):
-        """Creates or verifies long-term memory table."""
-        os.makedirs(os.path.dirname(self.long_db) or ".", exist_ok=True)
-        conn = sqlite3.connect(self.long_db)
-        c = conn.cursor()
-        c.execute("""
-        CREATE TABLE IF NOT EXISTS long_mem (
-            id TEXT PRIMARY KEY,
-            content TEXT,
-            meta TEXT,
-            created_at REAL
+        if self.use_sqlite_vec:
+            self._init_vec_table(self._conn, "short_vec")
+            self._init_vec_table(self._conn, "long_vec")
+        self._import_legacy_dbs()
+        self._pool = self._open_read_pool(self.db, self._conn)
+
+    def _import_legacy_dbs(self):
+        """
+        Copy rows from the separate short_db/long_db files used before the
+        single memory DB, then rename them to *.migrated so this runs once.
+
+        Only files configured as short_db/long_db are imported, plus the
+        default .praison files when db is the default one; an in-memory db
+        never takes them, so the files stay where they are.
+        """
+        if self.db == ":memory:":
+            return
+        default_db = os.path.abspath(self.db) == os.path.abspath(_DEFAULT_DB)
+        legacy = (
+            (self.cfg.get("short_db", _LEGACY_SHORT_DB if default_db else None), ("short_mem",), "short_vec"),
+            (self.cfg.get("long_db", _LEGACY_LONG_DB if default_db else None), ("long_mem", "emb_cache"), "long_vec"),
         )
-        """)
-        conn.commit()
-        conn.close()
+        conn = self._conn
+        for path, tables, vec_table in legacy:
+            if (
+                path is None
+                or path == ":memory:"
+                or not os.path.isfile(path)
+                or os.path.abspath(path) == os.path.abspath(self.db)
+            ):
+                continue
+            self._log_verbose("Importing legacy memory DB %s into %s", path, self.db)
+            conn.execute("ATTACH DATABASE ? AS legacy", (path,))
+            try:
+                with self._txn(conn):
+                    names = {row[0] for row in conn.execute("SELECT name FROM legacy.sqlite_master")}
+                    for table in tables:
+                        if table not in names:
+                            continue
+                        cols = {row[1] for row in conn.execute(f"PRAGMA legacy.table_info({table})")}
+                        if table == "emb_cache":
+                            dtype = "dtype" if "dtype" in cols else "'float32'"
+                            conn.execute(
+                                "INSERT OR IGNORE INTO main.emb_cache (hash, model, vec, dtype) "
+                                f"SELECT hash, model, vec, {dtype} FROM legacy.emb_cache"
+                            )
+                            continue
+                        copied = ", ".join(
+                            col for col in ("content", "meta", "created_at", "emb") if col in cols
+                        )
+                        # Non-numeric legacy ids get a fresh rowid
+                        conn.execute(
+                            f"INSERT OR IGNORE INTO main.{table} (id, {copied}) "
+                            f"SELECT CASE WHEN id NOT GLOB '*[^0-9]*' AND id != '' THEN CAST(id AS INTEGER) END, "
+                            f"{copied} FROM legacy.{table}"
+                        )
+                    if self.use_sqlite_vec and vec_table in names:
+                        operand = "vec_int8(embedding)" if vec_table in self._vec_int8_tables else "embedding"
+                        try:
+                            conn.execute(
+                                f"INSERT INTO main.{vec_table} (rowid, embedding) "
+                                f"SELECT rowid, {operand} FROM legacy.{vec_table}"
+                            )
+                        except sqlite3.Error as e:
+                            logger.error(f"Could not import {vec_table} from {path}: {e}")
+            finally:
+                conn.execute("DETACH DATABASE legacy")
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.replace(path + suffix, path + ".migrated" + suffix)
 
     def _init_mem0(self):
         """Initialize Mem0 client for agent or user memory with optional graph support."""
@@ -286,17 +1168,69 @@ class Memory:
                 self.chroma_col = self.chroma_client.get_collection(name=collection_name)
                 self._log_verbose("Using existing ChromaDB collection")
             except Exception as e:
-                self._log_verbose(f"Collection '{collection_name}' not found. Creating new collection. Error: {e}")
+                self._log_verbose("Collection '%s' not found. Creating new collection. Error: %s", collection_name, e)
                 self.chroma_col = self.chroma_client.create_collection(
                     name=collection_name,
-                    metadata={"hnsw:space": "cosine"}
+                    metadata={f"hnsw:{k}": v for k, v in self.hnsw_config.items()}
                 )
                 self._log_verbose("Created new ChromaDB collection")
+            self._vec = _ChromaVectorStore(self.chroma_col)
 
         except Exception as e:
-            self._log_verbose(f"Failed to initialize ChromaDB: {e}", logging.ERROR)
+            self._log_verbose("Failed to initialize ChromaDB: %s", e, level=logging.ERROR)
             self.use_rag = False
 
+    def _init_usearch(self):
+        """Initialize a local USearch HNSW index for embedding-based search."""
+        try:
+            rag_path = self.cfg.get("rag_db_path", "chroma_db")
+            os.makedirs(rag_path, exist_ok=True)
+            self._vec = _USearchVectorStore(
+                os.path.join(rag_path, "usearch.bin"),
+                self.embedding_dimensions,
+                self._lookup_long_term,
+                self.embedding_quantization,
+                connectivity=self.hnsw_config["M"],
+                expansion_add=self.hnsw_config["construction_ef"],
+                expansion_search=self.hnsw_config["search_ef"]
+            )
+
+            # Index rows stored since the last save; their vectors are kept in long_mem.emb
+            with self._reader(self._pool) as conn:
+                ids = [_hex_id(row[0]) for row in conn.execute("SELECT id FROM long_mem WHERE emb IS NOT NULL")]
+                missing = self._vec.missing(ids)
+                for start in range(0, len(missing), _SQLITE_IN_CHUNK):
+                    chunk = [_int_id(ident) for ident in missing[start:start + _SQLITE_IN_CHUNK]]
+                    rows = conn.execute(
+                        f"SELECT id, emb FROM long_mem WHERE id IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    rows = [row for row in rows if len(row[1]) == 4 * self.embedding_dimensions]
+                    if rows:
+                        self._vec.add(
+                            [_hex_id(row[0]) for row in rows], [], [],
+                            [_unpack_f32(row[1]) for row in rows]
+                        )
+            if missing:
+                self._log_verbose("Added %s memories to the USearch index", len(missing))
+        except Exception as e:
+            self._log_verbose("Failed to initialize USearch: %s", e, level=logging.ERROR)
+            self._vec = None
+            self.use_rag = False
+
+    def _lookup_long_term(
+        self, ids: List[str], where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Tuple[str, Dict]]:
+        """Map long_mem ids, optionally restricted by metadata filters, to (content, metadata)."""
+        clause, params = _sql_filter(where)
+        with self._reader(self._pool) as conn:
+            rows = conn.execute(
+                f"SELECT id, content, meta FROM long_mem WHERE id IN ({','.join('?' * len(ids))})"
+                + (f" AND {clause}" if clause else ""),
+                [*(_int_id(ident) for ident in ids), *params]
+            ).fetchall()
+        return {_hex_id(row[0]): (row[1], (_loads(row[2]) if row[2] else {})) for row in rows}
+
     def _init_mongodb(self):
         """Initialize MongoDB client for memory storage."""
         try:
@@ -332,7 +1266,7 @@ class Memory:
             self._log_verbose("MongoDB initialized successfully")
             
         except Exception as e:
-            self._log_verbose(f"Failed to initialize MongoDB: {e}", logging.ERROR)
+            self._log_verbose("Failed to initialize MongoDB: %s", e, level=logging.ERROR)
             self.use_mongodb = False
 
     def _create_mongodb_indexes(self):
@@ -357,7 +1291,7 @@ class Memory:
                 self._create_vector_search_indexes()
                 
         except Exception as e:
-            self._log_verbose(f"Warning: Could not create MongoDB indexes: {e}", logging.WARNING)
+            self._log_verbose("Warning: Could not create MongoDB indexes: %s", e, level=logging.WARNING)
 
     def _create_vector_search_indexes(self):
         """Create vector search indexes for Atlas."""
@@ -389,39 +1323,141 @@ class Memory:
                     self.mongo_long_term.create_search_index(vector_index_def, "vector_index")
                 self._log_verbose("Vector search indexes created successfully")
             except Exception as e:
-                self._log_verbose(f"Could not create vector search indexes: {e}", logging.WARNING)
+                self._log_verbose("Could not create vector search indexes: %s", e, level=logging.WARNING)
                 
         except Exception as e:
-            self._log_verbose(f"Error creating vector search indexes: {e}", logging.WARNING)
+            self._log_verbose("Error creating vector search indexes: %s", e, level=logging.WARNING)
 
     def _get_embedding(self, text: str) -> List[float]:
         """Get embedding for text using available embedding services."""
+        return self._get_embeddings([text])[0]
+
+    def _get_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Get embeddings for several texts at once.
+
+        Repeated texts are served from an in-memory LRU and the persistent
+        emb_cache table, keyed by sha256(model, text); all misses are fetched
+        with batched embedding requests. Failed lookups come back as None.
+        """
+        keys = [
+            hashlib.sha256(f"{self.embedding_model}\0{text}".encode("utf-8")).digest()
+            for text in texts
+        ]
+        found: Dict[bytes, List[float]] = {}
+        with self._emb_lock:
+            for key in keys:
+                if key in self._emb_cache:
+                    self._emb_cache.move_to_end(key)
+                    found[key] = self._emb_cache[key]
+
+        lookup = [key for key in dict.fromkeys(keys) if key not in found]
+        if lookup:
+            found.update(self._load_cached_embeddings(lookup))
+
+        misses: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                misses.setdefault(key, text)
+        if misses:
+            fetched = {
+                key: emb
+                for key, emb in zip(misses, self._embed_batch(list(misses.values())))
+                if emb
+            }
+            if fetched:
+                self._store_cached_embeddings(fetched)
+                found.update(fetched)
+
+        with self._emb_lock:
+            for key, emb in found.items():
+                self._emb_cache[key] = emb
+                self._emb_cache.move_to_end(key)
+            while len(self._emb_cache) > self._emb_cache_size:
+                self._emb_cache.popitem(last=False)
+        return [found.get(key) for key in keys]
+
+    def _embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Fetch embeddings from the API, up to _EMBEDDING_BATCH_SIZE inputs per request."""
+        embeddings = []
         try:
-            if LITELLM_AVAILABLE:
-                # Use LiteLLM for consistency with the rest of the codebase
-                import litellm
-                
-                response = litellm.embedding(
-                    model=self.embedding_model,
-                    input=text
-                )
-                return response.data[0]["embedding"]
-            elif OPENAI_AVAILABLE:
-                # Fallback to OpenAI client
+            for start in range(0, len(texts), _EMBEDDING_BATCH_SIZE):
+                batch = texts[start:start + _EMBEDDING_BATCH_SIZE]
+                logger.trace("Embedding %s input texts", len(batch))
+                if LITELLM_AVAILABLE:
+                    # Use LiteLLM for consistency with the rest of the codebase
+                    import litellm
+
+                    response = litellm.embedding(
+                        model=self.embedding_model,
+                        input=batch
+                    )
+                    embeddings.extend(item["embedding"] for item in response.data)
+                elif OPENAI_AVAILABLE:
+                    # Fallback to OpenAI client
+                    response = self._get_openai_client().embeddings.create(
+                        input=batch,
+                        model=self.embedding_model
+                    )
+                    embeddings.extend(item.embedding for item in response.data)
+                else:
+                    self._log_verbose("Neither litellm nor openai available for embeddings", level=logging.WARNING)
+                    return [None] * len(texts)
+        except Exception as e:
+            self._log_verbose("Error getting embedding: %s", e, level=logging.ERROR)
+            return [None] * len(texts)
+        return embeddings
+
+    def _get_openai_client(self):
+        """
+        Return the shared OpenAI client, created on first use since the
+        constructor fails when no API key is configured.
+        """
+        with self._openai_lock:
+            if self._openai is None:
                 from openai import OpenAI
-                client = OpenAI()
-                
-                response = client.embeddings.create(
-                    input=text,
-                    model=self.embedding_model
+                self._openai = OpenAI()
+            return self._openai
+
+    def _get_async_openai_client(self):
+        """Async counterpart of _get_openai_client, used by the async judge path."""
+        with self._openai_lock:
+            if self._async_openai is None:
+                from openai import AsyncOpenAI
+                self._async_openai = AsyncOpenAI()
+            return self._async_openai
+
+    def _load_cached_embeddings(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        """Look up embeddings in the persistent emb_cache table."""
+        found = {}
+        try:
+            with self._reader(self._pool) as conn:
+                for start in range(0, len(keys), _SQLITE_IN_CHUNK):
+                    chunk = keys[start:start + _SQLITE_IN_CHUNK]
+                    rows = conn.execute(
+                        f"SELECT hash, vec, dtype FROM emb_cache WHERE hash IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    for key, blob, dtype in rows:
+                        found[key] = _decode_embedding(blob, dtype)
+        except sqlite3.Error as e:
+            self._log_verbose("Error reading embedding cache: %s", e, level=logging.WARNING)
+        return found
+
+    def _store_cached_embeddings(self, embeddings: Dict[bytes, List[float]]):
+        """Persist freshly fetched embeddings to the emb_cache table."""
+        try:
+            with self._txn(self._conn) as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO emb_cache (hash, model, vec, dtype) VALUES (?,?,?,?)",
+                    [
+                        (key, self.embedding_model,
+                         _encode_embedding(emb, self.embedding_quantization), self.embedding_quantization)
+                        for key, emb in embeddings.items()
+                    ]
                 )
-                return response.data[0].embedding
-            else:
-                self._log_verbose("Neither litellm nor openai available for embeddings", logging.WARNING)
-                return None
-        except Exception as e:
-            self._log_verbose(f"Error getting embedding: {e}", logging.ERROR)
-            return None
+        except sqlite3.Error as e:
+            self._log_verbose("Error writing embedding cache: %s", e, level=logging.WARNING)
 
     def _get_embedding_dimensions(self, model_name: str) -> int:
         """Get embedding dimensions based on model name."""
@@ -442,6 +1478,212 @@ class Memory:
         # Default to 1536 for unknown models (OpenAI standard)
         return 1536
 
+    def _vec_operand(self, vec_table: str, embedding: List[float]) -> Tuple[str, bytes]:
+        """SQL placeholder and bound value for an embedding in a sqlite-vec table."""
+        if vec_table in self._vec_int8_tables:
+            return "vec_int8(?)", _quantize_int8(embedding)[0]
+        return "?", _pack_f32(embedding)
+
+    def _sqlite_insert(
+        self,
+        conn: sqlite3.Connection,
+        mem_table: str,
+        vec_table: str,
+        rows: List[Tuple[str, str, str, float]],
+        embeddings: Optional[List[Optional[List[float]]]] = None,
+        emb_column: bool = False
+    ):
+        """
+        Insert (id, content, meta, created_at) rows in one transaction, plus their
+        embeddings into the sqlite-vec table and/or the table's emb column when
+        given. Embeddings must be fetched beforehand so no API call happens while
+        the writer lock is held.
+        """
+        rows = [(_int_id(row[0]), *row[1:]) for row in rows]
+        with self._txn(conn):
+            if emb_column and embeddings:
+                conn.executemany(
+                    f"INSERT INTO {mem_table} (id, content, meta, created_at, emb) VALUES (?,?,?,?,?)",
+                    [
+                        (*row, _pack_f32(emb) if emb else None)
+                        for row, emb in zip(rows, embeddings)
+                    ]
+                )
+            else:
+                conn.executemany(
+                    f"INSERT INTO {mem_table} (id, content, meta, created_at) VALUES (?,?,?,?)",
+                    rows
+                )
+            if self.use_sqlite_vec and embeddings:
+                placeholder = "vec_int8(?)" if vec_table in self._vec_int8_tables else "?"
+                try:
+                    conn.executemany(
+                        f"INSERT INTO {vec_table} (rowid, embedding) VALUES (?, {placeholder})",
+                        [
+                            (row[0], self._vec_operand(vec_table, emb)[1])
+                            for row, emb in zip(rows, embeddings) if emb
+                        ]
+                    )
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to store embeddings in {vec_table}: {e}")
+
+    def _vec_search(
+        self,
+        conn: sqlite3.Connection,
+        mem_table: str,
+        vec_table: str,
+        embedding: Optional[List[float]],
+        limit: int,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Optional[List[tuple]]:
+        """
+        KNN search through sqlite-vec. Metadata filters are applied to the
+        joined rows, over-fetching neighbours to make up for rejected ones.
+        The query embedding is computed by the caller before it borrows conn,
+        since embedding reads emb_cache through the same reader pool.
+
+        Returns rows of (id, content, meta, created_at, distance), or None when
+        the query could not be embedded so callers can fall back to LIKE.
+        """
+        if not embedding:
+            return None
+        placeholder, operand = self._vec_operand(vec_table, embedding)
+        clause, params = _sql_filter(where, mem_table, "m.")
+        return conn.execute(
+            f"""
+            SELECT m.id, m.content, m.meta, m.created_at, v.distance
+            FROM (
+                SELECT rowid, distance FROM {vec_table}
+                WHERE embedding MATCH {placeholder} AND k = ?
+            ) AS v
+            JOIN {mem_table} AS m ON m.id = v.rowid
+            {f"WHERE {clause}" if clause else ""}
+            ORDER BY v.distance
+            LIMIT ?
+            """,
+            (operand, limit * _FILTER_OVERFETCH if where else limit, *params, limit)
+        ).fetchall()
+
+    def _load_emb_matrix(self, conn: sqlite3.Connection, mem_table: str) -> Tuple[Any, List[str]]:
+        """
+        Build the normalized embedding matrix of mem_table from its emb column on
+        first use. BLOBs are copied straight into a preallocated (N, D) array;
+        rows whose dimensions differ from the first stored embedding are skipped.
+        Reads go through the caller's pooled reader, so no second connection is
+        borrowed while _matrix_lock is held.
+        """
+        with self._matrix_lock:
+            if mem_table not in self._emb_matrices:
+                first = conn.execute(
+                    f"SELECT length(emb) FROM {mem_table} WHERE emb IS NOT NULL LIMIT 1"
+                ).fetchone()
+                nbytes = first[0] if first else 0
+                total, count = conn.execute(
+                    f"SELECT COUNT(*), COUNT(CASE WHEN length(emb) = ? THEN 1 END) "
+                    f"FROM {mem_table} WHERE emb IS NOT NULL",
+                    (nbytes,)
+                ).fetchone()
+                matrix = np.empty((count, nbytes // 4), dtype=np.float32)
+                ids = []
+                cursor = conn.execute(
+                    f"SELECT id, emb FROM {mem_table} WHERE length(emb) = ?", (nbytes,)
+                )
+                for ident, blob in cursor:
+                    if len(ids) == count:
+                        break  # rows stored after the count are appended on store
+                    matrix[len(ids)] = np.frombuffer(blob, dtype=np.float32)
+                    ids.append(ident)
+                matrix = matrix[:len(ids)]
+                if total > count:
+                    self._log_verbose(
+                        "Skipping %s embeddings with mismatched dimensions", total - count,
+                        level=logging.WARNING
+                    )
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                matrix /= norms
+                self._emb_matrices[mem_table] = (matrix, ids)
+                self._emb_ids[mem_table] = set(ids)
+            return self._emb_matrices[mem_table]
+
+    def _append_emb_matrix(self, mem_table: str, idents: List[str], embeddings: List[Optional[List[float]]]):
+        """Add newly stored embeddings to an already loaded matrix."""
+        with self._matrix_lock:
+            if mem_table not in self._emb_matrices:
+                return  # loaded from the DB on next search
+            matrix, ids = self._emb_matrices[mem_table]
+            seen = self._emb_ids[mem_table]
+            pairs = [
+                (_int_id(ident), emb) for ident, emb in zip(idents, embeddings)
+                if emb and (matrix.size == 0 or len(emb) == matrix.shape[1]) and _int_id(ident) not in seen
+            ]
+            if not pairs:
+                return
+            seen.update(ident for ident, _ in pairs)
+            block = np.asarray([emb for _, emb in pairs], dtype=np.float32)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            block /= norms
+            self._emb_matrices[mem_table] = (
+                block if matrix.size == 0 else np.concatenate((matrix, block)),
+                ids + [ident for ident, _ in pairs]
+            )
+
+    def _uses_embeddings(self) -> bool:
+        """Whether stores and searches go through _get_embedding (MongoDB vector search, SQLite ranking or a vector store)."""
+        return (
+            self.use_sqlite_embeddings
+            or (self.use_rag and self._vec is not None)
+            or (self.use_mongodb and getattr(self, "use_vector_search", False))
+        )
+
+    def _keeps_sqlite_embeddings(self) -> bool:
+        """Whether long_mem rows carry their embedding, for NumPy search or to rebuild a vectors-only index."""
+        return self.use_sqlite_embeddings or (self._vec is not None and not self._vec.stores_documents)
+
+    def _numpy_search(
+        self,
+        conn: sqlite3.Connection,
+        mem_table: str,
+        embedding: Optional[List[float]],
+        limit: int,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Optional[List[tuple]]:
+        """
+        Brute-force cosine search over mem_table's embeddings as one matrix-vector
+        product, with metadata filters applied like _vec_search. Returns rows
+        shaped like _vec_search, or None when the query cannot be embedded or
+        compared so callers fall back to LIKE.
+        """
+        if not embedding:
+            return None
+        matrix, ids = self._load_emb_matrix(conn, mem_table)
+        if not ids:
+            return []
+        q = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if len(q) != matrix.shape[1] or norm == 0:
+            return None
+        scores = matrix @ (q / norm)
+        k = min(limit * _FILTER_OVERFETCH if where else limit, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        top_ids = [ids[i] for i in top]
+        clause, params = _sql_filter(where, mem_table)
+        by_id = {
+            row[0]: row
+            for row in conn.execute(
+                f"SELECT id, content, meta, created_at FROM {mem_table} WHERE id IN ({','.join('?' * len(top_ids))})"
+                + (f" AND {clause}" if clause else ""),
+                [*top_ids, *params]
+            )
+        }
+        return [
+            (*by_id[ident], 1.0 - float(scores[i]))
+            for ident, i in zip(top_ids, top) if ident in by_id
+        ][:limit]
+
     # -------------------------------------------------------------------------
     #                      Basic Quality Score Computation
     # -------------------------------------------------------------------------
@@ -495,17 +1737,18 @@ class Memory:
         evaluator_quality: float = None
     ):
         """Store in short-term memory with optional quality metrics"""
-        logger.info(f"Storing in short-term memory: {text[:100]}...")
-        logger.info(f"Metadata: {metadata}")
+        self._invalidate_search_cache()
+        logger.info("Storing in short-term memory: %.100s...", text)
+        logger.info("Metadata: %s", metadata)
         
         metadata = self._process_quality_metrics(
             metadata, completeness, relevance, clarity, 
             accuracy, weights, evaluator_quality
         )
-        logger.info(f"Processed metadata: {metadata}")
+        logger.info("Processed metadata: %s", metadata)
         
         # Generate unique ID and timestamp once
-        ident = str(time.time_ns())
+        ident = self._new_ident()
         created_at = time.time()
         
         # Store in MongoDB if enabled
@@ -519,26 +1762,80 @@ class Memory:
                     "memory_type": "short_term"
                 }
                 self.mongo_short_term.insert_one(doc)
-                logger.info(f"Successfully stored in MongoDB short-term memory with ID: {ident}")
+                logger.info("Successfully stored in MongoDB short-term memory with ID: %s", ident)
             except Exception as e:
                 logger.error(f"Failed to store in MongoDB short-term memory: {e}")
                 raise
 
         # Existing SQLite store logic
         try:
-            conn = sqlite3.connect(self.short_db)
-            conn.execute(
-                "INSERT INTO short_mem (id, content, meta, created_at) VALUES (?,?,?,?)",
-                (ident, text, json.dumps(metadata), created_at)
+            embeddings = self._get_embeddings([text]) if self.use_sqlite_embeddings else None
+            self._sqlite_insert(
+                self._conn, "short_mem", "short_vec",
+                [(ident, text, _dumps(metadata), created_at)],
+                embeddings,
+                emb_column=self.use_sqlite_embeddings
             )
-            conn.commit()
-            conn.close()
-            logger.info(f"Successfully stored in SQLite short-term memory with ID: {ident}")
+            if self.use_numpy_search:
+                self._append_emb_matrix("short_mem", [ident], embeddings)
+            logger.info("Successfully stored in SQLite short-term memory with ID: %s", ident)
         except Exception as e:
             logger.error(f"Failed to store in SQLite short-term memory: {e}")
             if not self.use_mongodb:  # Only raise if we're not using MongoDB as fallback
                 raise
 
+    def store_short_term_bulk(
+        self,
+        items: List[Tuple[str, Optional[Dict[str, Any]]]]
+    ) -> List[str]:
+        """
+        Store many (text, metadata) pairs in short-term memory with a single
+        SQLite transaction instead of one commit per row.
+
+        Returns:
+            List[str]: IDs of the stored items, in input order
+        """
+        self._invalidate_search_cache()
+        created_at = time.time()
+        records = [(self._new_ident(), text, metadata or {}) for text, metadata in items]
+        if not records:
+            return []
+        logger.info("Storing %s items in short-term memory", len(records))
+
+        if self.use_mongodb and hasattr(self, "mongo_short_term"):
+            try:
+                self.mongo_short_term.insert_many([
+                    {
+                        "_id": ident,
+                        "content": text,
+                        "metadata": metadata,
+                        "created_at": datetime.utcnow(),
+                        "memory_type": "short_term"
+                    }
+                    for ident, text, metadata in records
+                ])
+            except Exception as e:
+                logger.error(f"Failed to bulk store in MongoDB short-term memory: {e}")
+                raise
+
+        try:
+            embeddings = (
+                self._get_embeddings([text for _, text, _ in records]) if self.use_sqlite_embeddings else None
+            )
+            self._sqlite_insert(
+                self._conn, "short_mem", "short_vec",
+                [(ident, text, _dumps(metadata), created_at) for ident, text, metadata in records],
+                embeddings,
+                emb_column=self.use_sqlite_embeddings
+            )
+            if self.use_numpy_search:
+                self._append_emb_matrix("short_mem", [ident for ident, _, _ in records], embeddings)
+        except Exception as e:
+            logger.error(f"Failed to bulk store in SQLite short-term memory: {e}")
+            if not self.use_mongodb:
+                raise
+        return [ident for ident, _, _ in records]
+
     def search_short_term(
         self, 
         query: str, 
@@ -546,22 +1843,36 @@ class Memory:
         min_quality: float = 0.0,
         relevance_cutoff: float = 0.0,
         rerank: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
         **kwargs
     ) -> List[Dict[str, Any]]:
-        """Search short-term memory with optional quality filter"""
-        self._log_verbose(f"Searching short memory for: {query}")
+        """
+        Search short-term memory with optional quality filter.
+
+        filters restricts hits by metadata, as in search_long_term; with mem0
+        they are passed to its search unchanged.
+        """
+        self._log_verbose("Searching short memory for: %s", query)
         
         if self.use_mem0 and hasattr(self, "mem0_client"):
-            # Pass rerank and other kwargs to Mem0 search
+            # Pass rerank, native mem0 filters and other kwargs to Mem0 search
             search_params = {"query": query, "limit": limit, "rerank": rerank}
+            if filters is not None:
+                search_params["filters"] = filters
             search_params.update(kwargs)
             results = self.mem0_client.search(**search_params)
-            filtered = [r for r in results if r.get("score", 1.0) >= relevance_cutoff]
+            filtered = [
+                r for r in results
+                if r.get("score", 1.0) >= relevance_cutoff
+            ]
             return filtered
             
         elif self.use_mongodb and hasattr(self, "mongo_short_term"):
             try:
                 results = []
+                meta_filter = _mongo_where(filters)
+                # $match runs after the $vectorSearch limit, so fetch extra
+                fetch = limit * _FILTER_OVERFETCH if _with_min_quality(filters, min_quality) else limit
                 
                 # If vector search is enabled and we have embeddings
                 if self.use_vector_search and hasattr(self, "_get_embedding"):
@@ -574,8 +1885,8 @@ class Memory:
                                     "index": "vector_index",
                                     "path": "embedding",
                                     "queryVector": embedding,
-                                    "numCandidates": limit * 10,
-                                    "limit": limit
+                                    "numCandidates": fetch * 10,
+                                    "limit": fetch
                                 }
                             },
                             {
@@ -586,9 +1897,11 @@ class Memory:
                             {
                                 "$match": {
                                     "metadata.quality": {"$gte": min_quality},
-                                    "score": {"$gte": relevance_cutoff}
+                                    "score": {"$gte": relevance_cutoff},
+                                    **meta_filter
                                 }
-                            }
+                            },
+                            {"$limit": limit}
                         ]
                         
                         for doc in self.mongo_short_term.aggregate(pipeline):
@@ -603,7 +1916,8 @@ class Memory:
                 if not results:
                     search_filter = {
                         "$text": {"$search": query},
-                        "metadata.quality": {"$gte": min_quality}
+                        "metadata.quality": {"$gte": min_quality},
+                        **meta_filter
                     }
                     
                     for doc in self.mongo_short_term.find(search_filter).limit(limit):
@@ -617,104 +1931,120 @@ class Memory:
                 return results
                 
             except Exception as e:
-                self._log_verbose(f"Error searching MongoDB short-term memory: {e}", logging.ERROR)
+                self._log_verbose("Error searching MongoDB short-term memory: %s", e, level=logging.ERROR)
                 return []
             
-        elif self.use_rag and hasattr(self, "chroma_col"):
+        elif self.use_rag and self._vec is not None:
             try:
-                if LITELLM_AVAILABLE:
-                    # Use LiteLLM for consistency with the rest of the codebase
-                    import litellm
-                    
-                    response = litellm.embedding(
-                        model=self.embedding_model,
-                        input=query
-                    )
-                    query_embedding = response.data[0]["embedding"]
-                elif OPENAI_AVAILABLE:
-                    # Fallback to OpenAI client
-                    from openai import OpenAI
-                    client = OpenAI()
-                    
-                    response = client.embeddings.create(
-                        input=query,
-                        model=self.embedding_model
-                    )
-                    query_embedding = response.data[0].embedding
-                else:
-                    self._log_verbose("Neither litellm nor openai available for embeddings", logging.WARNING)
+                query_embedding = self._get_embedding(query)
+                if not query_embedding:
                     return []
                 
-                resp = self.chroma_col.query(
-                    query_embeddings=[query_embedding],
-                    n_results=limit
-                )
-                
                 results = []
-                if resp["ids"]:
-                    for i in range(len(resp["ids"][0])):
-                        metadata = resp["metadatas"][0][i] if "metadatas" in resp else {}
-                        quality = metadata.get("quality", 0.0)
-                        score = 1.0 - (resp["distances"][0][i] if "distances" in resp else 0.0)
-                        if quality >= min_quality and score >= relevance_cutoff:
-                            results.append({
-                                "id": resp["ids"][0][i],
-                                "text": resp["documents"][0][i],
-                                "metadata": metadata,
-                                "score": score
-                            })
+                where = _with_min_quality(filters, min_quality)
+                for ident, text, metadata, distance in self._vec.query(query_embedding, limit, where):
+                    quality = metadata.get("quality", 0.0)
+                    score = 1.0 - distance
+                    if quality >= min_quality and score >= relevance_cutoff:
+                        results.append({
+                            "id": ident,
+                            "text": text,
+                            "metadata": metadata,
+                            "score": score
+                        })
                 return results
             except Exception as e:
-                self._log_verbose(f"Error searching ChromaDB: {e}", logging.ERROR)
+                self._log_verbose("Error searching vector store: %s", e, level=logging.ERROR)
                 return []
         
         else:
             # Local fallback
-            conn = sqlite3.connect(self.short_db)
-            c = conn.cursor()
-            rows = c.execute(
-                "SELECT id, content, meta FROM short_mem WHERE content LIKE ? LIMIT ?",
-                (f"%{query}%", limit)
-            ).fetchall()
-            conn.close()
+            where = _with_min_quality(filters, min_quality)
+            # Embed before borrowing a reader: a miss reads emb_cache from the pool
+            embedding = self._get_embedding(query) if self.use_sqlite_vec or self.use_numpy_search else None
+            with self._reader(self._pool) as conn:
+                rows = None
+                if self.use_sqlite_vec:
+                    rows = self._vec_search(conn, "short_mem", "short_vec", embedding, limit, where)
+                elif self.use_numpy_search:
+                    rows = self._numpy_search(conn, "short_mem", embedding, limit, where)
+                if rows is None:
+                    clause, params = _sql_filter(where, "short_mem")
+                    rows = conn.execute(
+                        self._SQL_SEARCH_STM.format(filter=f"AND {clause}" if clause else ""),
+                        (f"%{query}%", *params, limit)
+                    ).fetchall()
 
             results = []
             for row in rows:
-                meta = json.loads(row[2] or "{}")
+                meta = _loads(row[2]) if row[2] else {}
                 quality = meta.get("quality", 0.0)
                 if quality >= min_quality:
-                    results.append({
-                        "id": row[0],
+                    result = {
+                        "id": _hex_id(row[0]),
                         "text": row[1],
                         "metadata": meta
-                    })
+                    }
+                    if len(row) > 4:
+                        result["score"] = 1.0 - row[4]
+                    if result.get("score", 1.0) >= relevance_cutoff:
+                        results.append(result)
             return results
 
+    def search_combined(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Keyword search over short- and long-term SQLite memory in one query.
+
+        Returns up to ``limit`` hits from each tier, short-term first, tagged
+        with "type" like get_all_memories. Long-term texts carry the same
+        record citation as search_long_term.
+        """
+        with self._reader(self._pool) as conn:
+            rows = conn.execute(self._SQL_SEARCH_COMBINED, (f"%{query}%", limit)).fetchall()
+
+        results = []
+        for tier, row_id, content, meta, created_at in rows:
+            ident = _hex_id(row_id)
+            if tier == "long_term" and "(Memory record:" not in content:
+                content = f"{content} (Memory record: {ident})"
+            results.append({
+                "id": ident,
+                "text": content,
+                "metadata": _loads(meta) if meta else {},
+                "created_at": created_at,
+                "type": tier
+            })
+        return results
+
+    def _plain_sqlite(self) -> bool:
+        """Whether short- and long-term search are both plain LIKE queries on the local DB."""
+        return not (
+            self._uses_embeddings()
+            or (self.use_mem0 and hasattr(self, "mem0_client"))
+            or (self.use_mongodb and hasattr(self, "mongo_long_term"))
+        )
+
     def reset_short_term(self):
         """Completely clears short-term memory."""
-        conn = sqlite3.connect(self.short_db)
-        conn.execute("DELETE FROM short_mem")
-        conn.commit()
-        conn.close()
+        self._invalidate_search_cache()
+        with self._txn(self._conn) as conn:
+            conn.execute("DELETE FROM short_mem")
+            if self.use_sqlite_vec:
+                conn.execute("DELETE FROM short_vec")
+        with self._matrix_lock:
+            self._emb_matrices.pop("short_mem", None)
+            self._emb_ids.pop("short_mem", None)
 
     # -------------------------------------------------------------------------
     #                           Long-Term Methods
     # -------------------------------------------------------------------------
     def _sanitize_metadata(self, metadata: Dict) -> Dict:
         """Sanitize metadata for ChromaDB - convert to acceptable types"""
-        sanitized = {}
-        for k, v in metadata.items():
-            if v is None:
-                continue
-            if isinstance(v, (str, int, float, bool)):
-                sanitized[k] = v
-            elif isinstance(v, dict):
-                # Convert dict to string representation
-                sanitized[k] = str(v)
-            else:
-                # Convert other types to string
-                sanitized[k] = str(v)
-        return sanitized
+        # Exact-type set lookup first; isinstance keeps subclasses such as numpy floats
+        return {
+            k: v if type(v) in _PRIM_SET or isinstance(v, _PRIMS) else str(v)
+            for k, v in metadata.items() if v is not None
+        }
 
     def store_long_term(
         self,
@@ -728,8 +2058,9 @@ class Memory:
         evaluator_quality: float = None
     ):
         """Store in long-term memory with optional quality metrics"""
-        logger.info(f"Storing in long-term memory: {text[:100]}...")
-        logger.info(f"Initial metadata: {metadata}")
+        self._invalidate_search_cache()
+        logger.info("Storing in long-term memory: %.100s...", text)
+        logger.info("Initial metadata: %s", metadata)
         
         # Process metadata
         metadata = metadata or {}
@@ -737,12 +2068,17 @@ class Memory:
             metadata, completeness, relevance, clarity,
             accuracy, weights, evaluator_quality
         )
-        logger.info(f"Processed metadata: {metadata}")
+        logger.info("Processed metadata: %s", metadata)
         
         # Generate unique ID
-        ident = str(time.time_ns())
+        ident = self._new_ident()
         created = time.time()
 
+        # One embedding serves MongoDB vector search, SQLite ranking and ChromaDB
+        embedding = None
+        if self._uses_embeddings():
+            embedding = self._get_embedding(text)
+
         # Store in MongoDB if enabled (first priority)
         if self.use_mongodb and hasattr(self, "mongo_long_term"):
             try:
@@ -755,27 +2091,26 @@ class Memory:
                 }
                 
                 # Add embedding if vector search is enabled
-                if self.use_vector_search:
-                    embedding = self._get_embedding(text)
-                    if embedding:
-                        doc["embedding"] = embedding
+                if self.use_vector_search and embedding:
+                    doc["embedding"] = embedding
                 
                 self.mongo_long_term.insert_one(doc)
-                logger.info(f"Successfully stored in MongoDB long-term memory with ID: {ident}")
+                logger.info("Successfully stored in MongoDB long-term memory with ID: %s", ident)
             except Exception as e:
                 logger.error(f"Failed to store in MongoDB long-term memory: {e}")
                 # Continue to SQLite fallback
         
         # Store in SQLite
         try:
-            conn = sqlite3.connect(self.long_db)
-            conn.execute(
-                "INSERT INTO long_mem (id, content, meta, created_at) VALUES (?,?,?,?)",
-                (ident, text, json.dumps(metadata), created)
+            self._sqlite_insert(
+                self._conn, "long_mem", "long_vec",
+                [(ident, text, _dumps(metadata), created)],
+                [embedding],
+                emb_column=self._keeps_sqlite_embeddings()
             )
-            conn.commit()
-            conn.close()
-            logger.info(f"Successfully stored in SQLite with ID: {ident}")
+            if self.use_numpy_search:
+                self._append_emb_matrix("long_mem", [ident], [embedding])
+            logger.info("Successfully stored in SQLite with ID: %s", ident)
         except Exception as e:
             logger.error(f"Error storing in SQLite: {e}")
             if not (self.use_mongodb and hasattr(self, "mongo_long_term")):
@@ -783,55 +2118,21 @@ class Memory:
                 return
 
         # Store in vector database if enabled
-        if self.use_rag and hasattr(self, "chroma_col"):
+        if self.use_rag and self._vec is not None:
             try:
-                if LITELLM_AVAILABLE:
-                    # Use LiteLLM for consistency with the rest of the codebase
-                    import litellm
-                    
-                    logger.info("Getting embeddings from LiteLLM...")
-                    logger.trace(f"Embedding input text: {text}")
-                    
-                    response = litellm.embedding(
-                        model=self.embedding_model,
-                        input=text
-                    )
-                    embedding = response.data[0]["embedding"]
-                    logger.info("Successfully got embeddings from LiteLLM")
-                    logger.trace(f"Received embedding of length: {len(embedding)}")
-                    
-                elif OPENAI_AVAILABLE:
-                    # Fallback to OpenAI client
-                    from openai import OpenAI
-                    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-                    
-                    logger.info("Getting embeddings from OpenAI...")
-                    logger.trace(f"Embedding input text: {text}")
-                    
-                    response = client.embeddings.create(
-                        input=text,
-                        model=self.embedding_model
-                    )
-                    embedding = response.data[0].embedding
-                    logger.info("Successfully got embeddings from OpenAI")
-                    logger.trace(f"Received embedding of length: {len(embedding)}")
-                else:
-                    logger.warning("Neither litellm nor openai available for embeddings")
+                if not embedding:
+                    logger.warning("No embedding available, skipping vector store")
                     return
-                
+                logger.trace("Received embedding of length: %s", len(embedding))
+
                 # Sanitize metadata for ChromaDB
                 sanitized_metadata = self._sanitize_metadata(metadata)
                 
-                # Store in ChromaDB with embedding
-                self.chroma_col.add(
-                    documents=[text],
-                    metadatas=[sanitized_metadata],
-                    ids=[ident],
-                    embeddings=[embedding]
-                )
-                logger.info(f"Successfully stored in ChromaDB with ID: {ident}")
+                # Store in the vector store with embedding
+                self._vec.add([ident], [text], [sanitized_metadata], [embedding])
+                logger.info("Successfully stored in vector store with ID: %s", ident)
             except Exception as e:
-                logger.error(f"Error storing in ChromaDB: {e}")
+                logger.error(f"Error storing in vector store: {e}")
         
         elif self.use_mem0 and hasattr(self, "mem0_client"):
             try:
@@ -840,6 +2141,84 @@ class Memory:
             except Exception as e:
                 logger.error(f"Error storing in Mem0: {e}")
 
+    def store_long_term_bulk(
+        self,
+        items: List[Tuple[str, Optional[Dict[str, Any]]]]
+    ) -> List[str]:
+        """
+        Store many (text, metadata) pairs in long-term memory with a single
+        SQLite transaction and one vector store write.
+
+        Returns:
+            List[str]: IDs of the stored items, in input order
+        """
+        self._invalidate_search_cache()
+        created = time.time()
+        records = [(self._new_ident(), text, metadata or {}) for text, metadata in items]
+        if not records:
+            return []
+        logger.info("Storing %s items in long-term memory", len(records))
+
+        texts = [text for _, text, _ in records]
+        embeddings = [None] * len(records)
+        if self._uses_embeddings():
+            embeddings = self._get_embeddings(texts)
+
+        if self.use_mongodb and hasattr(self, "mongo_long_term"):
+            try:
+                docs = []
+                for (ident, text, metadata), embedding in zip(records, embeddings):
+                    doc = {
+                        "_id": ident,
+                        "content": text,
+                        "metadata": metadata,
+                        "created_at": datetime.utcnow(),
+                        "memory_type": "long_term"
+                    }
+                    if self.use_vector_search and embedding:
+                        doc["embedding"] = embedding
+                    docs.append(doc)
+                self.mongo_long_term.insert_many(docs)
+            except Exception as e:
+                logger.error(f"Failed to bulk store in MongoDB long-term memory: {e}")
+
+        try:
+            self._sqlite_insert(
+                self._conn, "long_mem", "long_vec",
+                [(ident, text, _dumps(metadata), created) for ident, text, metadata in records],
+                embeddings,
+                emb_column=self._keeps_sqlite_embeddings()
+            )
+            if self.use_numpy_search:
+                self._append_emb_matrix("long_mem", [ident for ident, _, _ in records], embeddings)
+        except Exception as e:
+            logger.error(f"Error bulk storing in SQLite: {e}")
+            if not (self.use_mongodb and hasattr(self, "mongo_long_term")):
+                return []
+
+        if self.use_rag and self._vec is not None:
+            try:
+                stored = [(rec, emb) for rec, emb in zip(records, embeddings) if emb]
+                if stored:
+                    self._vec.add(
+                        [ident for (ident, _, _), _ in stored],
+                        [text for (_, text, _), _ in stored],
+                        [self._sanitize_metadata(metadata) for (_, _, metadata), _ in stored],
+                        [emb for _, emb in stored]
+                    )
+                    self._vec.save()
+                    logger.info("Successfully stored %s items in vector store", len(stored))
+            except Exception as e:
+                logger.error(f"Error bulk storing in vector store: {e}")
+
+        elif self.use_mem0 and hasattr(self, "mem0_client"):
+            for _, text, metadata in records:
+                try:
+                    self.mem0_client.add(text, metadata=metadata)
+                except Exception as e:
+                    logger.error(f"Error storing in Mem0: {e}")
+
+        return [ident for ident, _, _ in records]
 
     def search_long_term(
         self, 
@@ -848,27 +2227,68 @@ class Memory:
         relevance_cutoff: float = 0.0,
         min_quality: float = 0.0,
         rerank: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Search long-term memory with optional quality filter.
+
+        filters restricts hits by metadata, as {key: value} for equality or
+        {key: {op: value}} with op one of eq, gt, gte, lt, lte, e.g.
+        {"quality": {"gte": 0.8}}. They are applied inside the store's query;
+        with mem0 they are passed to its search unchanged, in mem0's syntax.
+        """
+        if self.use_mem0 and hasattr(self, "mem0_client") and filters is not None:
+            kwargs["filters"] = filters
+            filters = None
+        return self._search_long_term(
+            query, limit, relevance_cutoff=relevance_cutoff, min_quality=min_quality,
+            rerank=rerank, where=filters, **kwargs
+        )
+
+    def _search_long_term(
+        self,
+        query: str,
+        limit: int = 5,
+        relevance_cutoff: float = 0.0,
+        min_quality: float = 0.0,
+        rerank: bool = False,
+        where: Optional[Dict[str, Any]] = None,
+        cite: bool = True,
         **kwargs
     ) -> List[Dict[str, Any]]:
-        """Search long-term memory with optional quality filter"""
-        self._log_verbose(f"Searching long memory for: {query}")
-        self._log_verbose(f"Min quality: {min_quality}")
+        """
+        search_long_term with metadata filters (e.g. {"category": "entity"}), and
+        min_quality, pushed down to each backend's query instead of filtering
+        results afterwards. With cite=False hit texts are returned without the
+        "(Memory record: id)" suffix.
+        """
+        self._log_verbose("Searching long memory for: %s", query)
+        self._log_verbose("Min quality: %s", min_quality)
+        where = _with_min_quality(where, min_quality)
 
         found = []
+        # mem0 and Atlas vector search filter after their limit, so fetch extra
+        fetch = limit * _FILTER_OVERFETCH if where else limit
 
         if self.use_mem0 and hasattr(self, "mem0_client"):
             # Pass rerank and other kwargs to Mem0 search
-            search_params = {"query": query, "limit": limit, "rerank": rerank}
+            search_params = {"query": query, "limit": fetch, "rerank": rerank}
             search_params.update(kwargs)
             results = self.mem0_client.search(**search_params)
             # Filter by quality
-            filtered = [r for r in results if r.get("metadata", {}).get("quality", 0.0) >= min_quality]
-            logger.info(f"Found {len(filtered)} results in Mem0")
+            filtered = [
+                r for r in results
+                if r.get("metadata", {}).get("quality", 0.0) >= min_quality
+                and _meta_matches(r.get("metadata"), where)
+            ][:limit]
+            logger.info("Found %s results in Mem0", len(filtered))
             return filtered
 
         elif self.use_mongodb and hasattr(self, "mongo_long_term"):
             try:
                 results = []
+                meta_filter = _mongo_where(where)
                 
                 # If vector search is enabled and we have embeddings
                 if self.use_vector_search:
@@ -881,8 +2301,8 @@ class Memory:
                                     "index": "vector_index",
                                     "path": "embedding",
                                     "queryVector": embedding,
-                                    "numCandidates": limit * 10,
-                                    "limit": limit
+                                    "numCandidates": fetch * 10,
+                                    "limit": fetch
                                 }
                             },
                             {
@@ -893,15 +2313,17 @@ class Memory:
                             {
                                 "$match": {
                                     "metadata.quality": {"$gte": min_quality},
-                                    "score": {"$gte": relevance_cutoff}
+                                    "score": {"$gte": relevance_cutoff},
+                                    **meta_filter
                                 }
-                            }
+                            },
+                            {"$limit": limit}
                         ]
                         
                         for doc in self.mongo_long_term.aggregate(pipeline):
                             text = doc["content"]
                             # Add memory record citation
-                            if "(Memory record:" not in text:
+                            if cite and "(Memory record:" not in text:
                                 text = f"{text} (Memory record: {str(doc['_id'])})"
                             results.append({
                                 "id": str(doc["_id"]),
@@ -914,13 +2336,14 @@ class Memory:
                 if not results:
                     search_filter = {
                         "$text": {"$search": query},
-                        "metadata.quality": {"$gte": min_quality}
+                        "metadata.quality": {"$gte": min_quality},
+                        **meta_filter
                     }
                     
                     for doc in self.mongo_long_term.find(search_filter).limit(limit):
                         text = doc["content"]
                         # Add memory record citation
-                        if "(Memory record:" not in text:
+                        if cite and "(Memory record:" not in text:
                             text = f"{text} (Memory record: {str(doc['_id'])})"
                         results.append({
                             "id": str(doc["_id"]),
@@ -929,112 +2352,102 @@ class Memory:
                             "score": 1.0  # Default score for text search
                         })
                 
-                logger.info(f"Found {len(results)} results in MongoDB")
+                logger.info("Found %s results in MongoDB", len(results))
                 return results
                 
             except Exception as e:
-                self._log_verbose(f"Error searching MongoDB long-term memory: {e}", logging.ERROR)
+                self._log_verbose("Error searching MongoDB long-term memory: %s", e, level=logging.ERROR)
                 # Fall through to SQLite search
 
-        elif self.use_rag and hasattr(self, "chroma_col"):
+        elif self.use_rag and self._vec is not None:
             try:
-                if LITELLM_AVAILABLE:
-                    # Use LiteLLM for consistency with the rest of the codebase
-                    import litellm
-                    
-                    response = litellm.embedding(
-                        model=self.embedding_model,
-                        input=query
-                    )
-                    query_embedding = response.data[0]["embedding"]
-                elif OPENAI_AVAILABLE:
-                    # Fallback to OpenAI client
-                    from openai import OpenAI
-                    client = OpenAI()
-                    
-                    response = client.embeddings.create(
-                        input=query,
-                        model=self.embedding_model
-                    )
-                    query_embedding = response.data[0].embedding
-                else:
-                    self._log_verbose("Neither litellm nor openai available for embeddings", logging.WARNING)
+                query_embedding = self._get_embedding(query)
+                if not query_embedding:
                     return []
                 
-                # Search ChromaDB with embedding
-                resp = self.chroma_col.query(
-                    query_embeddings=[query_embedding],
-                    n_results=limit,
-                    include=["documents", "metadatas", "distances"]
-                )
-                
-                results = []
-                if resp["ids"]:
-                    for i in range(len(resp["ids"][0])):
-                        metadata = resp["metadatas"][0][i] if "metadatas" in resp else {}
-                        text = resp["documents"][0][i]
-                        # Add memory record citation
-                        text = f"{text} (Memory record: {resp['ids'][0][i]})"
-                        found.append({
-                            "id": resp["ids"][0][i],
-                            "text": text,
-                            "metadata": metadata,
-                            "score": 1.0 - (resp["distances"][0][i] if "distances" in resp else 0.0)
-                        })
-                logger.info(f"Found {len(found)} results in ChromaDB")
+                # Search the vector store with embedding
+                for ident, text, metadata, distance in self._vec.query(query_embedding, limit, where):
+                    # Add memory record citation
+                    if cite:
+                        text = f"{text} (Memory record: {ident})"
+                    found.append({
+                        "id": ident,
+                        "text": text,
+                        "metadata": metadata,
+                        "score": 1.0 - distance
+                    })
+                logger.info("Found %s results in vector store", len(found))
 
             except Exception as e:
-                self._log_verbose(f"Error searching ChromaDB: {e}", logging.ERROR)
-
-        # Always try SQLite as fallback or additional source
-        conn = sqlite3.connect(self.long_db)
-        c = conn.cursor()
-        rows = c.execute(
-            "SELECT id, content, meta, created_at FROM long_mem WHERE content LIKE ? LIMIT ?",
-            (f"%{query}%", limit)
-        ).fetchall()
-        conn.close()
-
+                self._log_verbose("Error searching vector store: %s", e, level=logging.ERROR)
+
+        # Always try SQLite as fallback or additional source; as in
+        # search_short_term the query is embedded before borrowing a reader
+        embedding = self._get_embedding(query) if self.use_sqlite_vec or self.use_numpy_search else None
+        with self._reader(self._pool) as conn:
+            rows = None
+            if self.use_sqlite_vec:
+                rows = self._vec_search(conn, "long_mem", "long_vec", embedding, limit, where)
+            elif self.use_numpy_search:
+                rows = self._numpy_search(conn, "long_mem", embedding, limit, where)
+            if rows is None:
+                clause, params = _sql_filter(where)
+                rows = conn.execute(
+                    self._SQL_SEARCH_LTM.format(filter=f"AND {clause}" if clause else ""),
+                    (f"%{query}%", *params, limit)
+                ).fetchall()
+
+        seen_ids = {f["id"] for f in found}
         for row in rows:
-            meta = json.loads(row[2] or "{}")
+            ident = _hex_id(row[0])
+            # Only add if not already found by the vector store
+            if ident in seen_ids:
+                continue
+            seen_ids.add(ident)
+            meta = _loads(row[2]) if row[2] else {}
             text = row[1]
             # Add memory record citation if not already present
-            if "(Memory record:" not in text:
-                text = f"{text} (Memory record: {text})"
-            # Only add if not already found by ChromaDB/Mem0
-            if not any(f["id"] == row[0] for f in found):
-                found.append({
-                    "id": row[0],
-                    "text": text,
-                    "metadata": meta,
-                    "created_at": row[3]
-                })
-        logger.info(f"Found {len(found)} total results after SQLite")
+            if cite and "(Memory record:" not in text:
+                text = f"{text} (Memory record: {ident})"
+            hit = {
+                "id": ident,
+                "text": text,
+                "metadata": meta,
+                "created_at": row[3]
+            }
+            if len(row) > 4:
+                hit["score"] = 1.0 - row[4]
+            found.append(hit)
+        logger.info("Found %s total results after SQLite", len(found))
 
         results = found
 
         # Filter by quality if needed
         if min_quality > 0:
-            self._log_verbose(f"Found {len(results)} initial results")
+            self._log_verbose("Found %s initial results", len(results))
             results = [
                 r for r in results 
                 if r.get("metadata", {}).get("quality", 0.0) >= min_quality
             ]
-            self._log_verbose(f"After quality filter: {len(results)} results")
+            self._log_verbose("After quality filter: %s results", len(results))
 
         # Apply relevance cutoff if specified
         if relevance_cutoff > 0:
             results = [r for r in results if r.get("score", 1.0) >= relevance_cutoff]
-            logger.info(f"After relevance filter: {len(results)} results")
+            logger.info("After relevance filter: %s results", len(results))
         
         return results[:limit]
 
     def reset_long_term(self):
         """Clear local LTM DB, plus Chroma, MongoDB, or mem0 if in use."""
-        conn = sqlite3.connect(self.long_db)
-        conn.execute("DELETE FROM long_mem")
-        conn.commit()
-        conn.close()
+        self._invalidate_search_cache()
+        with self._txn(self._conn) as conn:
+            conn.execute("DELETE FROM long_mem")
+            if self.use_sqlite_vec:
+                conn.execute("DELETE FROM long_vec")
+        with self._matrix_lock:
+            self._emb_matrices.pop("long_mem", None)
+            self._emb_ids.pop("long_mem", None)
 
         if self.use_mem0 and hasattr(self, "mem0_client"):
             # Mem0 has no universal reset API. Could implement partial or no-op.
@@ -1044,8 +2457,10 @@ class Memory:
                 self.mongo_long_term.delete_many({})
                 self._log_verbose("MongoDB long-term memory cleared")
             except Exception as e:
-                self._log_verbose(f"Error clearing MongoDB long-term memory: {e}", logging.ERROR)
-        if self.use_rag and hasattr(self, "chroma_client"):
+                self._log_verbose("Error clearing MongoDB long-term memory: %s", e, level=logging.ERROR)
+        if self.use_rag and self.rag_backend == "usearch" and self._vec is not None:
+            self._vec.reset()
+        elif self.use_rag and hasattr(self, "chroma_client"):
             self.chroma_client.reset()  # entire DB
             self._init_chroma()         # re-init fresh
 
@@ -1064,13 +2479,8 @@ class Memory:
         """
         Filter to items that have metadata 'category=entity'.
         """
-        all_hits = self.search_long_term(query, limit=20)  # gather more
-        ents = []
-        for h in all_hits:
-            meta = h.get("metadata") or {}
-            if meta.get("category") == "entity":
-                ents.append(h)
-        return ents[:limit]
+        # Entities are short structured strings, returned without citations
+        return self._search_long_term(query, limit=limit, where={"category": "entity"}, cite=False)
 
     def reset_entity_only(self):
         """
@@ -1087,6 +2497,7 @@ class Memory:
         """
         If mem0 is used, do user-based addition. Otherwise store in LTM with user in metadata.
         """
+        self._invalidate_search_cache()
         meta = {"user_id": user_id}
         if extra:
             meta.update(extra)
@@ -1096,7 +2507,7 @@ class Memory:
         elif self.use_mongodb and hasattr(self, "mongo_users"):
             try:
                 from datetime import datetime
-                ident = str(time.time_ns())
+                ident = self._new_ident()
                 doc = {
                     "_id": ident,
                     "user_id": user_id,
@@ -1105,9 +2516,9 @@ class Memory:
                     "created_at": datetime.utcnow()
                 }
                 self.mongo_users.insert_one(doc)
-                self._log_verbose(f"Successfully stored user memory for {user_id}")
+                self._log_verbose("Successfully stored user memory for %s", user_id)
             except Exception as e:
-                self._log_verbose(f"Error storing user memory: {e}", logging.ERROR)
+                self._log_verbose("Error storing user memory: %s", e, level=logging.ERROR)
         else:
             self.store_long_term(text, metadata=meta)
 
@@ -1138,16 +2549,10 @@ class Memory:
                 
                 return results
             except Exception as e:
-                self._log_verbose(f"Error searching MongoDB user memory: {e}", logging.ERROR)
+                self._log_verbose("Error searching MongoDB user memory: %s", e, level=logging.ERROR)
                 return []
         else:
-            hits = self.search_long_term(query, limit=20)
-            filtered = []
-            for h in hits:
-                meta = h.get("metadata", {})
-                if meta.get("user_id") == user_id:
-                    filtered.append(h)
-            return filtered[:limit]
+            return self._search_long_term(query, limit=limit, where={"user_id": user_id})
 
     def search(self, query: str, user_id: Optional[str] = None, agent_id: Optional[str] = None, 
                run_id: Optional[str] = None, limit: int = 5, rerank: bool = False, **kwargs) -> List[Dict[str, Any]]:
@@ -1217,8 +2622,8 @@ class Memory:
         task_id: str = None
     ):
         """Store task output in memory with appropriate metadata"""
-        logger.info(f"Finalizing task output: {content[:100]}...")
-        logger.info(f"Agent: {agent_name}, Quality: {quality_score}, Threshold: {threshold}")
+        logger.info("Finalizing task output: %.100s...", content)
+        logger.info("Agent: %s, Quality: %s, Threshold: %s", agent_name, quality_score, threshold)
         
         metadata = {
             "task_id": task_id,
@@ -1228,7 +2633,7 @@ class Memory:
             "task_type": "output",
             "stored_at": time.time()
         }
-        logger.info(f"Prepared metadata: {metadata}")
+        logger.info("Prepared metadata: %s", metadata)
         
         # Always store in short-term memory
         try:
@@ -1244,7 +2649,7 @@ class Memory:
         # Store in long-term memory if quality meets threshold
         if quality_score >= threshold:
             try:
-                logger.info(f"Quality score {quality_score} >= {threshold}, storing in long-term memory...")
+                logger.info("Quality score %s >= %s, storing in long-term memory...", quality_score, threshold)
                 self.store_long_term(
                     text=content,
                     metadata=metadata
@@ -1253,7 +2658,7 @@ class Memory:
             except Exception as e:
                 logger.error(f"Failed to store in long-term memory: {e}")
         else:
-            logger.info(f"Quality score {quality_score} < {threshold}, skipping long-term storage")
+            logger.info("Quality score %s < %s, skipping long-term storage", quality_score, threshold)
 
     # -------------------------------------------------------------------------
     #                 Building Context (Short, Long, Entities, User)
@@ -1285,11 +2690,9 @@ class Memory:
 
         def normalize_content(content: str) -> str:
             """Normalize content for deduplication"""
-            # Extract just the main content without citations for comparison
-            normalized = content.split("(Memory record:")[0].strip()
-            # Keep more characters to reduce false duplicates
-            normalized = ''.join(c.lower() for c in normalized if not c.isspace())
-            return normalized
+            # Extract just the main content without citations for comparison,
+            # keeping more characters to reduce false duplicates
+            return content.split("(Memory record:")[0].lower().translate(_WS_TRANS)
 
         def format_content(content: str, max_len: int = 150) -> str:
             """Format content with clean truncation at word boundaries"""
@@ -1338,7 +2741,7 @@ class Memory:
             if formatted_hits:
                 # Log detailed memory content for debugging including section headers
                 brief_title = title.replace(" Context", "").replace("Memory ", "")
-                logger.debug(f"Memory section '{brief_title}' ({len(formatted_hits)} items): {formatted_hits}")
+                logger.debug("Memory section '%s' (%s items): %s", brief_title, len(formatted_hits), formatted_hits)
                 
                 # Only include memory content in output when specified (controlled by log level or explicit parameter)
                 if include_in_output:
@@ -1352,11 +2755,25 @@ class Memory:
                     lines.append("")  # Space after content
 
         # Add each section
-        # First get all results
-        short_term = self.search_short_term(q, limit=max_items)
-        long_term = self.search_long_term(q, limit=max_items)
-        entities = self.search_entity(q, limit=max_items)
-        user_mem = self.search_user_memory(user_id, q, limit=max_items) if user_id else []
+        # First get all results; the searches are independent and mostly wait
+        # on the backends, so run them concurrently. Embedding the query up
+        # front lets all of them share one cached embedding.
+        if self._uses_embeddings():
+            self._get_embedding(q)
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            entity_future = ex.submit(self.search_entity, q, limit=max_items)
+            user_future = ex.submit(self.search_user_memory, user_id, q, limit=max_items) if user_id else None
+            if self._plain_sqlite():
+                # Both tiers live in the one DB file: fetch them in a single query
+                combined = self.search_combined(q, limit=max_items)
+                short_term = [h for h in combined if h["type"] == "short_term"]
+                long_term = [h for h in combined if h["type"] == "long_term"]
+            else:
+                stm_future = ex.submit(self.search_short_term, q, limit=max_items)
+                long_term = self.search_long_term(q, limit=max_items)
+                short_term = stm_future.result()
+            entities = entity_future.result()
+            user_mem = user_future.result() if user_future else []
 
         # Add sections in order of priority
         add_section("Short-term Memory Context", short_term)
@@ -1392,7 +2809,10 @@ class Memory:
         metadata = metadata or {}
         
         # Handle sub-metrics if provided
-        if None not in [completeness, relevance, clarity, accuracy]:
+        if (
+            completeness is not None and relevance is not None
+            and clarity is not None and accuracy is not None
+        ):
             metadata.update({
                 "completeness": completeness,
                 "relevance": relevance,
@@ -1408,92 +2828,417 @@ class Memory:
         
         return metadata
 
+    def _load_judgement(self, key: bytes) -> Optional[Dict[str, float]]:
+        """Look up cached judge metrics in the in-memory LRU, then the judge_cache table."""
+        with self._judge_lock:
+            metrics = self._judge_cache.get(key)
+            if metrics is not None:
+                self._judge_cache.move_to_end(key)
+                return dict(metrics)
+        try:
+            with self._reader(self._pool) as conn:
+                row = conn.execute("SELECT metrics FROM judge_cache WHERE hash = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            self._log_verbose("Error reading judge cache: %s", e, level=logging.WARNING)
+            return None
+        if row is None:
+            return None
+        metrics = _loads(row[0])
+        self._remember_judgement(key, metrics)
+        return dict(metrics)
+
+    def _remember_judgement(self, key: bytes, metrics: Dict[str, float]):
+        with self._judge_lock:
+            self._judge_cache[key] = metrics
+            self._judge_cache.move_to_end(key)
+            while len(self._judge_cache) > self._judge_cache_size:
+                self._judge_cache.popitem(last=False)
+
+    def _store_judgement(self, key: bytes, model: str, metrics: Dict[str, float]):
+        """Cache judge metrics in memory and persist them to the judge_cache table."""
+        self._remember_judgement(key, dict(metrics))
+        try:
+            with self._txn(self._conn) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO judge_cache (hash, model, metrics, created_at) VALUES (?,?,?,?)",
+                    (key, model, _dumps(metrics), time.time())
+                )
+        except sqlite3.Error as e:
+            self._log_verbose("Error writing judge cache: %s", e, level=logging.WARNING)
+
+    def _judge_key(self, prompt: str, model_name: str, nondeterministic: bool = False) -> Optional[bytes]:
+        """Cache key of a judge prompt; None for nondeterministic calls, which are never cached."""
+        if nondeterministic:
+            return None
+        return hashlib.sha256(
+            f"{model_name}\0{_JUDGE_TEMPERATURE}\0{_JUDGE_SEED}\0{prompt}".encode("utf-8")
+        ).digest()
+
+    def _cached_judgement(self, key: Optional[bytes], model_name: str) -> Optional[Dict[str, float]]:
+        """Cache lookup per judge_cache_mode; raises CacheMiss on a replay miss."""
+        if self.judge_cache_mode not in _JUDGE_CACHE_READS:
+            return None
+        cached = self._load_judgement(key) if key is not None else None
+        if key is not None:
+            with self._judge_lock:
+                self.judge_stats["hits" if cached is not None else "misses"] += 1
+        if cached is None and self.judge_cache_mode == "replay":
+            raise CacheMiss(f"No cached quality metrics for this prompt with model {model_name!r}")
+        return cached
+
+    def _judge_completion(
+        self,
+        prompt: str,
+        model_name: str,
+        complete: Callable[[Any], bool] = _has_metrics,
+        nondeterministic: bool = False
+    ) -> Optional[Any]:
+        """
+        Send one judge prompt and return the decoded JSON reply, or None
+        without an LLM library. The reply is streamed and the stream closed
+        as soon as the JSON received so far satisfies `complete`.
+        """
+        if self._judge_limiter is not None:
+            self._judge_limiter.acquire(tokens=len(prompt) // 4)
+        started = time.perf_counter()
+        if LITELLM_AVAILABLE:
+            # Use LiteLLM for consistency with the rest of the codebase
+            import litellm
+
+            response = litellm.completion(
+                model=model_name,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True},
+                drop_params=True,  # for providers without seed support
+                **_judge_sampling(nondeterministic)
+            )
+        elif OPENAI_AVAILABLE:
+            # Fallback to OpenAI client
+            response = self._get_openai_client().chat.completions.create(
+                model=model_name,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True},
+                **_judge_sampling(nondeterministic)
+            )
+        else:
+            logger.error("Neither litellm nor openai available for quality calculation")
+            return None
+
+        buffer = []
+        usage = None
+        try:
+            for chunk in response:
+                usage = getattr(chunk, "usage", None) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    buffer.append(delta)
+                    partial = _stream_checkpoint(buffer, delta)
+                    if partial is not None and complete(partial):
+                        return partial
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+            self._record_judge_call(started, prompt, buffer, usage)
+        return _loads("".join(buffer))
+
+    def _record_judge_call(self, started: float, prompt: str, reply: List[str], usage: Any):
+        """Add one judge request's latency and token counts to judge_stats."""
+        latency_ms = (time.perf_counter() - started) * 1000
+        # Streams closed early never reach the final usage chunk; count those
+        # with the same ~4 characters per token estimate the rate limiter uses
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        if prompt_tokens is None:
+            prompt_tokens = len(prompt) // 4
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if completion_tokens is None:
+            completion_tokens = sum(map(len, reply)) // 4
+        with self._judge_lock:
+            self.judge_stats["latency_ms"].append(latency_ms)
+            self.judge_stats["prompt_tokens"] += prompt_tokens
+            self.judge_stats["completion_tokens"] += completion_tokens
+
+    def get_judge_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the quality-judge counters.
+
+        Returns:
+            Dict with cache "hits" and "misses", per-request "latency_ms"
+            (the most recent judge_stats_window requests) and total
+            "prompt_tokens" and "completion_tokens".
+        """
+        with self._judge_lock:
+            stats = dict(self.judge_stats)
+            stats["latency_ms"] = list(stats["latency_ms"])
+        return stats
+
+    def _accept_judgement(self, metrics: Any, model_name: str, key: Optional[bytes]) -> Dict[str, float]:
+        """Validate a judge reply and cache its metrics; raises on malformed replies."""
+        # Validate metrics
+        if not isinstance(metrics, dict) or not _REQUIRED_METRICS.issubset(metrics):
+            raise ValueError("Missing required metrics in LLM response")
+
+        logger.info("Calculated metrics: %s", metrics)
+        if self.judge_cache_mode in _JUDGE_CACHE_WRITES and key is not None:
+            self._store_judgement(key, model_name, metrics)
+        return metrics
+
+    def _judge(
+        self, prompt: str, model_name: str, key: Optional[bytes], nondeterministic: bool = False
+    ) -> Dict[str, float]:
+        """Ask the LLM to score one prompt, caching the metrics on success."""
+        try:
+            metrics = self._judge_completion(prompt, model_name, nondeterministic=nondeterministic)
+            if metrics is not None:
+                return self._accept_judgement(metrics, model_name, key)
+        except Exception as e:
+            logger.error("Error calculating metrics: %s", e)
+        return dict(_ZERO_METRICS)
+
+    async def _ajudge_completion(
+        self,
+        prompt: str,
+        model_name: str,
+        complete: Callable[[Any], bool] = _has_metrics,
+        nondeterministic: bool = False
+    ) -> Optional[Any]:
+        """Async _judge_completion, also streamed and throttled by the judge_rate_limiter."""
+        if self._judge_limiter is not None:
+            await self._judge_limiter.acquire_async(tokens=len(prompt) // 4)
+        started = time.perf_counter()
+        if LITELLM_AVAILABLE:
+            import litellm
+
+            response = await litellm.acompletion(
+                model=model_name,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True},
+                drop_params=True,  # for providers without seed support
+                **_judge_sampling(nondeterministic)
+            )
+        elif OPENAI_AVAILABLE:
+            response = await self._get_async_openai_client().chat.completions.create(
+                model=model_name,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True},
+                **_judge_sampling(nondeterministic)
+            )
+        else:
+            logger.error("Neither litellm nor openai available for quality calculation")
+            return None
+
+        buffer = []
+        usage = None
+        try:
+            async for chunk in response:
+                usage = getattr(chunk, "usage", None) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    buffer.append(delta)
+                    partial = _stream_checkpoint(buffer, delta)
+                    if partial is not None and complete(partial):
+                        return partial
+        finally:
+            close = getattr(response, "aclose", None) or getattr(response, "close", None)
+            if close is not None:
+                result = close()
+                if asyncio.iscoroutine(result):
+                    await result
+            self._record_judge_call(started, prompt, buffer, usage)
+        return _loads("".join(buffer))
+
+    async def _ajudge(
+        self, prompt: str, model_name: str, key: Optional[bytes], nondeterministic: bool = False
+    ) -> Dict[str, float]:
+        """Async _judge."""
+        try:
+            metrics = await self._ajudge_completion(prompt, model_name, nondeterministic=nondeterministic)
+            if metrics is not None:
+                return self._accept_judgement(metrics, model_name, key)
+        except Exception as e:
+            logger.error("Error calculating metrics: %s", e)
+        return dict(_ZERO_METRICS)
+
+    def _judge_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        model_name: str,
+        keys: List[Optional[bytes]],
+        nondeterministic: bool = False
+    ) -> Optional[List[Dict[str, float]]]:
+        """
+        Score several (output, expected_output) pairs with one LLM request.
+        Returns None when the reply is unusable, so callers can fall back to
+        one request per pair.
+        """
+        numbered = "\n".join(
+            f"Pair {n}:\nExpected: {expected_output}\nActual: {output}\n"
+            for n, (output, expected_output) in enumerate(pairs, 1)
+        )
+        try:
+            reply = self._judge_completion(
+                _BATCH_EVAL_TEMPLATE.format(count=len(pairs), pairs=numbered), model_name,
+                complete=lambda partial: _has_batch_metrics(partial, len(pairs)),
+                nondeterministic=nondeterministic
+            )
+            if reply is None:
+                return None
+            results = reply.get("results") if isinstance(reply, dict) else None
+            if not _has_batch_metrics(reply, len(pairs)):
+                raise ValueError("Batch response does not hold one set of metrics per pair")
+        except Exception as e:
+            logger.warning("Batch quality evaluation failed, scoring pairs one by one: %s", e)
+            return None
+
+        if self.judge_cache_mode in _JUDGE_CACHE_WRITES and not nondeterministic:
+            for key, metrics in zip(keys, results):
+                self._store_judgement(key, model_name, metrics)
+        return results
+
+    def calculate_quality_metrics_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        llm: Optional[str] = None,
+        batch_size: int = _JUDGE_BATCH_SIZE,
+        nondeterministic: bool = False
+    ) -> List[Dict[str, float]]:
+        """
+        Calculate quality metrics for many (output, expected_output) pairs.
+
+        Uncached pairs are scored batch_size at a time in a single LLM request
+        each; if a batch reply is malformed those pairs are scored one by one.
+        Results are cached per pair exactly as calculate_quality_metrics does,
+        and nondeterministic has the same meaning.
+        """
+        model_name = llm or "gpt-5-nano"
+        prompts = [
+            _DEFAULT_EVAL_TEMPLATE.format(expected=expected_output, output=output)
+            for output, expected_output in pairs
+        ]
+        keys = [self._judge_key(prompt, model_name, nondeterministic) for prompt in prompts]
+        results = [self._cached_judgement(key, model_name) for key in keys]
+        pending = [i for i, metrics in enumerate(results) if metrics is None]
+        logger.info("Calculating quality metrics for %s of %s pairs", len(pending), len(pairs))
+
+        for start in range(0, len(pending), max(batch_size, 1)):
+            chunk = pending[start:start + max(batch_size, 1)]
+            if len(chunk) > 1:
+                scored = self._judge_batch(
+                    [pairs[i] for i in chunk], model_name, [keys[i] for i in chunk], nondeterministic
+                )
+                if scored is not None:
+                    for i, metrics in zip(chunk, scored):
+                        results[i] = metrics
+                    continue
+            for i in chunk:
+                results[i] = self._judge(prompts[i], model_name, keys[i], nondeterministic)
+        return results
+
     def calculate_quality_metrics(
         self,
         output: str,
         expected_output: str,
         llm: Optional[str] = None,
-        custom_prompt: Optional[str] = None
+        custom_prompt: Optional[str] = None,
+        nondeterministic: bool = False
     ) -> Dict[str, float]:
-        """Calculate quality metrics using LLM"""
+        """
+        Calculate quality metrics using LLM.
+
+        The judge samples greedily with a fixed seed, and results are cached
+        by sha256(model, temperature, seed, prompt) so repeated evaluations
+        skip the API call; see "judge_cache_mode" in the config. Raises
+        CacheMiss in "replay" mode when the prompt was never judged.
+        nondeterministic=True samples at temperature 0.3 without a seed and
+        bypasses the cache, for callers who want score variance.
+        """
         logger.info("Calculating quality metrics for output")
-        logger.info(f"Output: {output[:100]}...")
-        logger.info(f"Expected: {expected_output[:100]}...")
-        
-        # Default evaluation prompt
-        default_prompt = f"""
-        Evaluate the following output against expected output.
-        Score each metric from 0.0 to 1.0:
-        - Completeness: Does it address all requirements?
-        - Relevance: Does it match expected output?
-        - Clarity: Is it clear and well-structured?
-        - Accuracy: Is it factually correct?
-
-        Expected: {expected_output}
-        Actual: {output}
-
-        Return ONLY a JSON with these keys: completeness, relevance, clarity, accuracy
-        Example: {{"completeness": 0.95, "relevance": 0.8, "clarity": 0.9, "accuracy": 0.85}}
+        logger.info("Output: %.100s...", output)
+        logger.info("Expected: %.100s...", expected_output)
+
+        if not custom_prompt:
+            return self.calculate_quality_metrics_batch(
+                [(output, expected_output)], llm, nondeterministic=nondeterministic
+            )[0]
+
+        model_name = llm or "gpt-5-nano"
+        key = self._judge_key(custom_prompt, model_name, nondeterministic)
+        cached = self._cached_judgement(key, model_name)
+        if cached is not None:
+            logger.info("Using cached quality metrics")
+            return cached
+        return self._judge(custom_prompt, model_name, key, nondeterministic)
+
+    async def acalculate_quality_metrics(
+        self,
+        output: str,
+        expected_output: str,
+        llm: Optional[str] = None,
+        custom_prompt: Optional[str] = None,
+        nondeterministic: bool = False
+    ) -> Dict[str, float]:
+        """Async calculate_quality_metrics; shares its cache and judge_rate_limiter."""
+        model_name = llm or "gpt-5-nano"
+        prompt = (
+            custom_prompt if custom_prompt
+            else _DEFAULT_EVAL_TEMPLATE.format(expected=expected_output, output=output)
+        )
+        key = self._judge_key(prompt, model_name, nondeterministic)
+        cached = self._cached_judgement(key, model_name)
+        if cached is not None:
+            logger.info("Using cached quality metrics")
+            return cached
+        return await self._ajudge(prompt, model_name, key, nondeterministic)
+
+    async def aevaluate_many(
+        self,
+        pairs: List[Tuple[str, str]],
+        llm: Optional[str] = None,
+        custom_prompts: Optional[List[Optional[str]]] = None,
+        concurrency: int = 16,
+        nondeterministic: bool = False
+    ) -> List[Dict[str, float]]:
+        """
+        Score many (output, expected_output) pairs concurrently, one request
+        each, with at most `concurrency` requests in flight. Use this instead
+        of calculate_quality_metrics_batch when pairs need their own prompts
+        (custom_prompts, parallel to pairs; None entries use the default).
+        Configure "judge_rate_limiter" to stay under provider RPM/TPM limits.
         """
+        if custom_prompts is not None and len(custom_prompts) != len(pairs):
+            raise ValueError(
+                f"custom_prompts has {len(custom_prompts)} entries for {len(pairs)} pairs"
+            )
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        prompts = custom_prompts if custom_prompts is not None else [None] * len(pairs)
 
-        try:
-            if LITELLM_AVAILABLE:
-                # Use LiteLLM for consistency with the rest of the codebase
-                import litellm
-                
-                # Convert model name if it's in litellm format
-                model_name = llm or "gpt-5-nano"
-                
-                response = litellm.completion(
-                    model=model_name,
-                    messages=[{
-                        "role": "user", 
-                        "content": custom_prompt or default_prompt
-                    }],
-                    response_format={"type": "json_object"},
-                    temperature=0.3
-                )
-            elif OPENAI_AVAILABLE:
-                # Fallback to OpenAI client
-                from openai import OpenAI
-                client = OpenAI()
-                
-                response = client.chat.completions.create(
-                    model=llm or "gpt-5-nano",
-                    messages=[{
-                        "role": "user", 
-                        "content": custom_prompt or default_prompt
-                    }],
-                    response_format={"type": "json_object"},
-                    temperature=0.3
+        async def evaluate(pair: Tuple[str, str], custom_prompt: Optional[str]) -> Dict[str, float]:
+            async with semaphore:
+                return await self.acalculate_quality_metrics(
+                    pair[0], pair[1], llm, custom_prompt, nondeterministic
                 )
-            else:
-                logger.error("Neither litellm nor openai available for quality calculation")
-                return {
-                    "completeness": 0.0,
-                    "relevance": 0.0,
-                    "clarity": 0.0,
-                    "accuracy": 0.0
-                }
-            
-            metrics = json.loads(response.choices[0].message.content)
-            
-            # Validate metrics
-            required = ["completeness", "relevance", "clarity", "accuracy"]
-            if not all(k in metrics for k in required):
-                raise ValueError("Missing required metrics in LLM response")
-            
-            logger.info(f"Calculated metrics: {metrics}")
-            return metrics
-            
-        except Exception as e:
-            logger.error(f"Error calculating metrics: {e}")
-            return {
-                "completeness": 0.0,
-                "relevance": 0.0,
-                "clarity": 0.0,
-                "accuracy": 0.0
-            }
+
+        return list(await asyncio.gather(*(evaluate(pair, prompt) for pair, prompt in zip(pairs, prompts))))
 
     def store_quality(
         self,
@@ -1505,30 +3250,26 @@ class Memory:
         memory_type: Literal["short", "long"] = "long"
     ) -> None:
         """Store quality metrics in memory"""
-        logger.info(f"Attempting to store in {memory_type} memory: {text[:100]}...")
+        logger.info("Attempting to store in %s memory: %.100s...", memory_type, text)
         
         metadata = {
             "quality": quality_score,
             "task_id": task_id,
-            "iteration": iteration
+            "iteration": iteration,
+            **(metrics or {})
         }
-        
-        if metrics:
-            metadata.update({
-                k: v for k, v in metrics.items()  # Remove metric_ prefix
-            })
-            
-        logger.info(f"With metadata: {metadata}")
+        logger.info("With metadata: %s", metadata)
         
         try:
-            if memory_type == "short":
-                self.store_short_term(text, metadata=metadata)
-                logger.info("Successfully stored in short-term memory")
-            else:
-                self.store_long_term(text, metadata=metadata)
-                logger.info("Successfully stored in long-term memory")
+            self._store_dispatch.get(memory_type, self.store_long_term)(text, metadata=metadata)
+            logger.info("Successfully stored in %s-term memory", "short" if memory_type == "short" else "long")
         except Exception as e:
-            logger.error(f"Failed to store in memory: {e}")
+            logger.error("Failed to store in memory: %s", e)
+
+    def _invalidate_search_cache(self):
+        with self._search_lock:
+            self._search_gen += 1
+            self._search_cache.clear()
 
     def search_with_quality(
         self,
@@ -1537,25 +3278,51 @@ class Memory:
         memory_type: Literal["short", "long"] = "long",
         limit: int = 5
     ) -> List[Dict[str, Any]]:
-        """Search with quality filter"""
-        logger.info(f"Searching {memory_type} memory for: {query}")
-        logger.info(f"Min quality: {min_quality}")
-        
-        search_func = (
-            self.search_short_term if memory_type == "short" 
-            else self.search_long_term
-        )
-        
-        results = search_func(query, limit=limit)
-        logger.info(f"Found {len(results)} initial results")
+        """
+        Search with quality filter.
+
+        Identical calls within search_cache_ttl seconds (default 5) return the
+        cached results; any store or reset through this Memory clears them.
+        """
+        logger.info("Searching %s memory for: %s", memory_type, query)
+        logger.info("Min quality: %s", min_quality)
+
+        key = (query, min_quality, memory_type, limit)
+        with self._search_lock:
+            gen = self._search_gen
+            cached = self._search_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self._search_cache_ttl:
+                self._search_cache.move_to_end(key)
+                logger.info("Using cached search results")
+                return _copy_hits(cached[1])
         
-        filtered = [
-            r for r in results 
-            if r.get("metadata", {}).get("quality", 0.0) >= min_quality
-        ]
-        logger.info(f"After quality filter: {len(filtered)} results")
+        # Applied by the store; the check below covers backends that cannot
+        search = self._search_dispatch.get(memory_type, self.search_long_term)
+        results = search(query, limit=limit, min_quality=min_quality)
+        logger.info("Found %s initial results", len(results))
         
-        return filtered
+        if NUMPY_AVAILABLE and len(results) >= _NUMPY_FILTER_MIN:
+            # One C-level comparison over all scores instead of a per-row test
+            scores = np.fromiter(
+                ((r.get("metadata") or _NO_METADATA).get("quality", 0.0) for r in results),
+                dtype=np.float64, count=len(results)
+            )
+            filtered = [results[i] for i in np.flatnonzero(scores >= min_quality)]
+        else:
+            filtered = [
+                r for r in results
+                if (r.get("metadata") or _NO_METADATA).get("quality", 0.0) >= min_quality
+            ]
+        logger.info("After quality filter: %s results", len(filtered))
+
+        if self._search_cache_size > 0 and self._search_cache_ttl > 0:
+            with self._search_lock:
+                if gen == self._search_gen:
+                    self._search_cache[key] = (time.monotonic(), filtered)
+                    self._search_cache.move_to_end(key)
+                    while len(self._search_cache) > self._search_cache_size:
+                        self._search_cache.popitem(last=False)
+        return _copy_hits(filtered)
 
     def get_all_memories(self) -> List[Dict[str, Any]]:
         """Get all memories from both short-term and long-term storage"""
@@ -1563,15 +3330,13 @@ class Memory:
         
         try:
             # Get short-term memories
-            conn = sqlite3.connect(self.short_db)
-            c = conn.cursor()
-            rows = c.execute("SELECT id, content, meta, created_at FROM short_mem").fetchall()
-            conn.close()
+            with self._reader(self._pool) as conn:
+                rows = conn.execute(self._SQL_ALL_STM).fetchall()
             
             for row in rows:
-                meta = json.loads(row[2] or "{}")
+                meta = _loads(row[2]) if row[2] else {}
                 all_memories.append({
-                    "id": row[0],
+                    "id": _hex_id(row[0]),
                     "text": row[1],
                     "metadata": meta,
                     "created_at": row[3],
@@ -1579,15 +3344,13 @@ class Memory:
                 })
             
             # Get long-term memories
-            conn = sqlite3.connect(self.long_db)
-            c = conn.cursor()
-            rows = c.execute("SELECT id, content, meta, created_at FROM long_mem").fetchall()
-            conn.close()
+            with self._reader(self._pool) as conn:
+                rows = conn.execute(self._SQL_ALL_LTM).fetchall()
             
             for row in rows:
-                meta = json.loads(row[2] or "{}")
+                meta = _loads(row[2]) if row[2] else {}
                 all_memories.append({
-                    "id": row[0],
+                    "id": _hex_id(row[0]),
                     "text": row[1],
                     "metadata": meta,
                     "created_at": row[3],
@@ -1597,5 +3360,5 @@ class Memory:
             return all_memories
             
         except Exception as e:
-            self._log_verbose(f"Error getting all memories: {e}", logging.ERROR)
+            self._log_verbose("Error getting all memories: %s", e, level=logging.ERROR)
             return []
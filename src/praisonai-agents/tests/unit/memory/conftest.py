@@ -0,0 +1,22 @@
+import pytest
+
+from praisonaiagents.memory.memory import Memory
+
+
+@pytest.fixture
+def make_memory(tmp_path):
+    """Factory for Memory backed only by SQLite files inside tmp_path; closes each one at teardown."""
+    opened = []
+
+    def make(**config):
+        mem = Memory({
+            "provider": "none",
+            "db": str(tmp_path / "memory.db"),
+            **config,
+        })
+        opened.append(mem)
+        return mem
+
+    yield make
+    for mem in opened:
+        mem.close()
@@ -0,0 +1,468 @@
+"""
+Unit tests for the quality-metrics (LLM judge) paths of Memory.
+
+Tests cover:
+- The judge cache and its modes
+- Judge cache, latency and token statistics
+- Batched evaluation of several output/expected pairs
+- Concurrent async evaluation
+- Streamed judge replies and partial JSON parsing
+- The search_with_quality result cache and its quality filter
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from praisonaiagents.memory import memory as memory_module
+from praisonaiagents.memory.memory import CacheMiss, Memory, _close_partial_json
+
+METRICS = {"completeness": 0.9, "relevance": 0.8, "clarity": 0.7, "accuracy": 0.6}
+
+
+class FakeStream:
+    """Streamed reply: the JSON text in small chunks, then trailing whitespace."""
+
+    def __init__(self, text):
+        pieces = [text[i:i + 7] for i in range(0, len(text), 7)] + ["\n"] * 3
+        self.chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+            for piece in pieces
+        ]
+        self.sent = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self:
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions and records each request."""
+
+    def __init__(self):
+        self.calls = []
+        self.streams = []
+        self.batch_reply = None
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        prompt = kwargs["messages"][0]["content"]
+        pairs = prompt.count("Pair ")
+        if pairs:
+            reply = self.batch_reply or {"results": [METRICS] * pairs}
+        else:
+            reply = METRICS
+        self.streams.append(FakeStream(json.dumps(reply)))
+        return self.streams[-1]
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    """Async client.chat.completions that tracks how many requests overlap."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return FakeCompletions.create(self, **kwargs)
+
+
+@pytest.fixture
+def judge(monkeypatch, tmp_path):
+    """Route judge calls to a fake OpenAI client."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(memory_module, "LITELLM_AVAILABLE", False)
+    monkeypatch.setattr(memory_module, "OPENAI_AVAILABLE", True)
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(Memory, "_get_openai_client", lambda self: client)
+    return completions
+
+
+# =============================================================================
+# Judge Cache Tests
+# =============================================================================
+
+class TestJudgeCache:
+    """Tests for caching calculate_quality_metrics results."""
+
+    def test_repeat_served_from_cache(self, make_memory, judge):
+        """The same output/expected pair should only be judged once."""
+        mem = make_memory()
+        first = mem.calculate_quality_metrics("out", "expected")
+        second = mem.calculate_quality_metrics("out", "expected")
+        assert first == second == METRICS
+        assert len(judge.calls) == 1
+        mem.calculate_quality_metrics("out", "expected", llm="gpt-4o-mini")
+        assert len(judge.calls) == 2
+        mem.close()
+
+    def test_cache_persists_across_instances(self, make_memory, judge):
+        """Cached metrics should survive a restart via the judge_cache table."""
+        mem = make_memory()
+        mem.calculate_quality_metrics("out", "expected")
+        mem.close()
+
+        replay = make_memory(judge_cache_mode="replay")
+        assert replay.calculate_quality_metrics("out", "expected") == METRICS
+        assert len(judge.calls) == 1
+        replay.close()
+
+    def test_replay_miss_raises(self, make_memory, judge):
+        """Replay mode should never call the LLM."""
+        mem = make_memory(judge_cache_mode="replay")
+        with pytest.raises(CacheMiss):
+            mem.calculate_quality_metrics("out", "expected")
+        assert judge.calls == []
+        mem.close()
+
+    def test_disabled_always_calls(self, make_memory, judge):
+        mem = make_memory(judge_cache_mode="disabled")
+        mem.calculate_quality_metrics("out", "expected")
+        mem.calculate_quality_metrics("out", "expected")
+        assert len(judge.calls) == 2
+        mem.close()
+
+    def test_read_only_never_stores(self, make_memory, judge):
+        mem = make_memory(judge_cache_mode="read-only")
+        mem.calculate_quality_metrics("out", "expected")
+        mem.calculate_quality_metrics("out", "expected")
+        assert len(judge.calls) == 2
+        mem.close()
+
+    def test_write_only_refreshes(self, make_memory, judge):
+        """write-only always calls the LLM, and its results serve later readers."""
+        writer = make_memory(judge_cache_mode="write-only")
+        writer.calculate_quality_metrics("out", "expected")
+        writer.calculate_quality_metrics("out", "expected")
+        assert len(judge.calls) == 2
+        writer.close()
+
+        reader = make_memory(judge_cache_mode="read-only")
+        assert reader.calculate_quality_metrics("out", "expected") == METRICS
+        assert len(judge.calls) == 2
+        reader.close()
+
+    def test_cached_result_is_a_copy(self, make_memory, judge):
+        """Mutating a returned dict must not change later cache hits."""
+        mem = make_memory()
+        mem.calculate_quality_metrics("out", "expected")["accuracy"] = 0.0
+        assert mem.calculate_quality_metrics("out", "expected") == METRICS
+        mem.close()
+
+    def test_seeded_greedy_sampling(self, make_memory, judge):
+        mem = make_memory()
+        mem.calculate_quality_metrics("out", "expected")
+        assert judge.calls[0]["temperature"] == 0
+        assert judge.calls[0]["seed"] == 0
+        mem.close()
+
+    def test_nondeterministic_bypasses_cache(self, make_memory, judge):
+        mem = make_memory()
+        mem.calculate_quality_metrics("out", "expected", nondeterministic=True)
+        mem.calculate_quality_metrics("out", "expected", nondeterministic=True)
+        assert len(judge.calls) == 2
+        assert "seed" not in judge.calls[0]
+        assert judge.calls[0]["temperature"] > 0
+        # Sampled scores are never cached for deterministic callers either
+        mem.calculate_quality_metrics("out", "expected")
+        assert len(judge.calls) == 3
+        mem.close()
+
+    def test_prompts(self, make_memory, judge):
+        """Custom prompts are sent verbatim; braces in outputs survive the default template."""
+        mem = make_memory()
+        mem.calculate_quality_metrics("out", "expected", custom_prompt="Score {this}")
+        mem.calculate_quality_metrics('{"a": 1}', "expected")
+        assert judge.calls[0]["messages"][0]["content"] == "Score {this}"
+        assert 'Actual: {"a": 1}' in judge.calls[1]["messages"][0]["content"]
+        mem.close()
+
+    def test_failures_score_zero(self, make_memory, judge, monkeypatch):
+        """Unusable replies give zero metrics, a fresh dict each time, and are not cached."""
+        monkeypatch.setattr(FakeCompletions, "create", lambda self, **kw: FakeStream('{"clarity": 1.0}'))
+        mem = make_memory()
+        first = mem.calculate_quality_metrics("out", "expected")
+        assert first == dict.fromkeys(("completeness", "relevance", "clarity", "accuracy"), 0.0)
+        first["accuracy"] = 1.0
+        assert mem.calculate_quality_metrics("out", "expected")["accuracy"] == 0.0
+        mem.close()
+
+    def test_stats_counted(self, make_memory, judge):
+        """Hits, misses, latency and estimated tokens for streams closed early."""
+        mem = make_memory()
+        mem.calculate_quality_metrics("out", "expected")
+        mem.calculate_quality_metrics("out", "expected")
+        stats = mem.get_judge_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert len(stats["latency_ms"]) == 1
+        assert stats["latency_ms"][0] >= 0
+        assert stats["prompt_tokens"] == len(judge.calls[0]["messages"][0]["content"]) // 4
+        assert stats["completion_tokens"] > 0
+        assert judge.calls[0]["stream_options"] == {"include_usage": True}
+        # The snapshot is detached from the live counters
+        stats["latency_ms"].clear()
+        assert len(mem.get_judge_stats()["latency_ms"]) == 1
+        mem.close()
+
+    def test_stats_use_reported_usage(self, make_memory, judge, monkeypatch):
+        create = FakeCompletions.create
+
+        def create_with_usage(self, **kwargs):
+            stream = create(self, **kwargs)
+            stream.chunks[-4].usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+            return stream
+
+        monkeypatch.setattr(FakeCompletions, "create", create_with_usage)
+        mem = make_memory(judge_cache_mode="disabled")
+        mem.calculate_quality_metrics("out", "expected")
+        mem.calculate_quality_metrics("out", "expected")
+        stats = mem.get_judge_stats()
+        assert (stats["hits"], stats["misses"]) == (0, 0)
+        assert stats["prompt_tokens"] == 240
+        assert stats["completion_tokens"] == 60
+        mem.close()
+
+    def test_invalid_mode(self, make_memory, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(ValueError):
+            make_memory(judge_cache_mode="sometimes")
+
+
+# =============================================================================
+# Batch Evaluation Tests
+# =============================================================================
+
+class TestBatchEvaluation:
+    """Tests for calculate_quality_metrics_batch."""
+
+    def test_pairs_share_requests(self, make_memory, judge):
+        """Five pairs with batch_size=2 should take three LLM requests."""
+        mem = make_memory()
+        pairs = [(f"out {i}", f"expected {i}") for i in range(5)]
+        results = mem.calculate_quality_metrics_batch(pairs, batch_size=2)
+        assert results == [METRICS] * 5
+        assert len(judge.calls) == 3
+        mem.close()
+
+    def test_batch_results_cached_per_pair(self, make_memory, judge):
+        mem = make_memory()
+        mem.calculate_quality_metrics_batch([("a", "x"), ("b", "y")])
+        assert mem.calculate_quality_metrics("b", "y") == METRICS
+        assert len(judge.calls) == 1
+        mem.close()
+
+    def test_length_mismatch_falls_back(self, make_memory, judge):
+        """A batch reply with the wrong number of entries is retried pair by pair."""
+        judge.batch_reply = {"results": [METRICS]}
+        mem = make_memory()
+        results = mem.calculate_quality_metrics_batch([("a", "x"), ("b", "y"), ("c", "z")])
+        assert results == [METRICS] * 3
+        assert len(judge.calls) == 4
+        mem.close()
+
+
+# =============================================================================
+# Async Evaluation Tests
+# =============================================================================
+
+@pytest.fixture
+def async_judge(monkeypatch, tmp_path):
+    """Route async judge calls to a fake AsyncOpenAI client."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(memory_module, "LITELLM_AVAILABLE", False)
+    monkeypatch.setattr(memory_module, "OPENAI_AVAILABLE", True)
+    completions = FakeAsyncCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(Memory, "_get_async_openai_client", lambda self: client)
+    return completions
+
+
+class TestAsyncEvaluation:
+    """Tests for acalculate_quality_metrics and aevaluate_many."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self, make_memory, async_judge):
+        mem = make_memory()
+        pairs = [(f"out {i}", f"expected {i}") for i in range(10)]
+        results = await mem.aevaluate_many(pairs, concurrency=3)
+        assert results == [METRICS] * 10
+        assert len(async_judge.calls) == 10
+        assert 1 < async_judge.max_in_flight <= 3
+        mem.close()
+
+    @pytest.mark.asyncio
+    async def test_custom_prompts_length_checked(self, make_memory, async_judge):
+        mem = make_memory()
+        with pytest.raises(ValueError):
+            await mem.aevaluate_many([("a", "x"), ("b", "y")], custom_prompts=["p"])
+        assert async_judge.calls == []
+        mem.close()
+
+    @pytest.mark.asyncio
+    async def test_shares_sync_cache(self, make_memory, async_judge):
+        mem = make_memory()
+        await mem.acalculate_quality_metrics("out", "expected")
+        mem.cfg["judge_cache_mode"] = mem.judge_cache_mode = "replay"
+        assert mem.calculate_quality_metrics("out", "expected") == METRICS
+        assert len(async_judge.calls) == 1
+        mem.close()
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_charged(self, make_memory, async_judge):
+        """Each request should acquire from the limiter with a token estimate."""
+        acquired = []
+
+        class Limiter:
+            async def acquire_async(self, tokens=0):
+                acquired.append(tokens)
+
+        mem = make_memory(judge_rate_limiter=Limiter())
+        await mem.aevaluate_many([("a", "x"), ("b", "y")], custom_prompts=["p" * 40, None])
+        assert len(acquired) == 2
+        assert 10 in acquired
+        mem.close()
+
+
+# =============================================================================
+# Streaming Tests
+# =============================================================================
+
+class TestStreamedJudge:
+    """Tests for reading streamed judge replies."""
+
+    @pytest.mark.parametrize("partial, closed", [
+        ('{"completeness": 0.9', None),
+        ('{"completeness": 0.95, "rel', '{"completeness": 0.95}'),
+        ('{"results": [{"accuracy": 1}, {"acc', '{"results": [{"accuracy": 1}]}'),
+        ('{"note": "a, b}", "scores": [1, 2', '{"note": "a, b}", "scores": [1]}'),
+    ])
+    def test_close_partial_json(self, partial, closed):
+        assert _close_partial_json(partial) == closed
+
+    def test_stops_once_metrics_parsed(self, make_memory, judge):
+        """The stream should be closed at the closing brace, not drained."""
+        mem = make_memory()
+        assert mem.calculate_quality_metrics("out", "expected") == METRICS
+        stream = judge.streams[0]
+        assert judge.calls[0]["stream"] is True
+        assert stream.closed
+        assert stream.sent < len(stream.chunks)
+        mem.close()
+
+    def test_batch_stops_once_all_pairs_parsed(self, make_memory, judge):
+        mem = make_memory()
+        assert mem.calculate_quality_metrics_batch([("a", "x"), ("b", "y")]) == [METRICS] * 2
+        stream = judge.streams[0]
+        assert stream.closed
+        assert stream.sent < len(stream.chunks)
+        mem.close()
+
+
+# =============================================================================
+# Search Cache Tests
+# =============================================================================
+
+class TestSearchCache:
+    """Tests for caching search_with_quality results."""
+
+    @pytest.fixture
+    def searches(self, monkeypatch):
+        calls = []
+        original = Memory.search_long_term
+
+        def counting_search(self, *args, **kwargs):
+            calls.append(args)
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(Memory, "search_long_term", counting_search)
+        return calls
+
+    def test_repeat_served_from_cache(self, make_memory, tmp_path, monkeypatch, searches):
+        monkeypatch.chdir(tmp_path)
+        mem = make_memory()
+        mem.store_quality("cached answer", 0.9)
+        first = mem.search_with_quality("cached", min_quality=0.5)
+        assert mem.search_with_quality("cached", min_quality=0.5) == first
+        assert len(searches) == 1
+        mem.search_with_quality("cached", min_quality=0.6)
+        assert len(searches) == 2
+        mem.close()
+
+    def test_cached_results_are_copies(self, make_memory, tmp_path, monkeypatch, searches):
+        """Editing returned hits must not change later cache hits."""
+        monkeypatch.chdir(tmp_path)
+        mem = make_memory()
+        mem.store_quality("cached answer", 0.9)
+        first = mem.search_with_quality("cached", min_quality=0.5)
+        first[0]["metadata"]["quality"] = 0.0
+        first[0]["text"] = "edited"
+        second = mem.search_with_quality("cached", min_quality=0.5)
+        second.clear()
+        third = mem.search_with_quality("cached", min_quality=0.5)
+        assert len(searches) == 1
+        assert third[0]["metadata"]["quality"] == 0.9
+        assert third[0]["text"] != "edited"
+        mem.close()
+
+    def test_store_invalidates(self, make_memory, tmp_path, monkeypatch, searches):
+        monkeypatch.chdir(tmp_path)
+        mem = make_memory()
+        mem.store_quality("cached answer", 0.9)
+        assert len(mem.search_with_quality("cached", min_quality=0.5)) == 1
+        mem.store_quality("cached answer two", 0.9)
+        assert len(mem.search_with_quality("cached", min_quality=0.5)) == 2
+        mem.close()
+
+    def test_unknown_memory_type_uses_long_term(self, make_memory, tmp_path, monkeypatch, searches):
+        monkeypatch.chdir(tmp_path)
+        mem = make_memory()
+        mem.store_quality("fallback answer", 0.9, memory_type="archive")
+        hits = mem.search_with_quality("fallback", memory_type="archive")
+        assert len(hits) == 1
+        assert len(searches) == 1
+        mem.close()
+
+    def test_entries_expire(self, make_memory, tmp_path, monkeypatch, searches):
+        monkeypatch.chdir(tmp_path)
+        mem = make_memory(search_cache_ttl=5.0)
+        now = [1000.0]
+        monkeypatch.setattr(memory_module.time, "monotonic", lambda: now[0])
+        mem.search_with_quality("anything")
+        now[0] += 6.0
+        mem.search_with_quality("anything")
+        assert len(searches) == 2
+        mem.close()
+
+
+class TestQualityFilter:
+    """Tests for the Python-side safety-net filter in search_with_quality."""
+
+    @pytest.mark.parametrize("count", [5, 200])
+    def test_unfiltered_backend_results(self, make_memory, tmp_path, monkeypatch, count):
+        """Results from a backend that ignored filters are still screened, at any size."""
+        monkeypatch.chdir(tmp_path)
+        mem = make_memory()
+        rows = [{"id": str(i), "metadata": {"quality": (i % 10) / 10}} for i in range(count)]
+        rows.append({"id": "bare"})
+        mem._search_dispatch["long"] = lambda query, limit, min_quality: rows
+        hits = mem.search_with_quality("q", min_quality=0.8, limit=count)
+        assert [h["id"] for h in hits] == [r["id"] for r in rows[:-1] if r["metadata"]["quality"] >= 0.8]
+        mem.close()
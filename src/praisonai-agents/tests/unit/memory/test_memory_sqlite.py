@@ -0,0 +1,655 @@
+"""
+Unit tests for the SQLite storage paths of Memory.
+
+Tests cover:
+- Persistent WAL connections and the read-only connection pool
+- Bulk short-term and long-term writes
+- Metadata filters pushed into SQL
+- Filters and over-fetching for mem0 searches
+- Embedding batching, caching and quantized storage
+- sqlite-vec KNN search, filters and quantized vec tables
+- NumPy cosine ranking without sqlite-vec
+- The USearch vector store backend
+- Integer row ids and migration from TEXT ids
+- The single memory DB and import of legacy files
+"""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from praisonaiagents.memory.memory import Memory, _decode_embedding, _encode_embedding
+
+
+@pytest.fixture
+def memory(make_memory, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return make_memory()
+
+
+@pytest.fixture
+def embed_calls(monkeypatch):
+    """Replace the embeddings API with a deterministic fake and record each batch."""
+    calls = []
+
+    def fake_embed_batch(self, texts):
+        calls.append(list(texts))
+        return [[float(len(t)), 1.0, 0.5] for t in texts]
+
+    monkeypatch.setattr(Memory, "_embed_batch", fake_embed_batch)
+    return calls
+
+
+# =============================================================================
+# Connection Tests
+# =============================================================================
+
+class TestConnections:
+    """Tests for persistent SQLite connections."""
+
+    def test_wal_enabled(self, memory):
+        """Persistent connections should run in WAL mode."""
+        mode = memory._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_close_is_idempotent(self, memory):
+        """close() can be called more than once."""
+        memory.close()
+        memory.close()
+        assert memory._conn is None
+
+    def test_reader_is_read_only(self, memory):
+        """Pooled reader connections reject writes."""
+        with memory._reader(memory._pool) as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM long_mem")
+
+    def test_nested_reads_share_connection(self, make_memory, tmp_path, monkeypatch):
+        """A thread holding a reader gets it back instead of waiting on the pool."""
+        monkeypatch.chdir(tmp_path)
+        mem = make_memory(read_pool_size=1)
+        with mem._reader(mem._pool) as outer:
+            with mem._reader(mem._pool) as inner:
+                assert inner is outer
+        assert mem._pool.qsize() == 1
+        mem.close()
+
+    def test_concurrent_searches(self, memory):
+        """Searches from several threads see committed writes."""
+        memory.store_long_term("shared fact")
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            results = list(ex.map(lambda _: memory.search_long_term("shared"), range(32)))
+        assert all(len(r) == 1 for r in results)
+
+
+# =============================================================================
+# Bulk Write Tests
+# =============================================================================
+
+class TestBulkWrites:
+    """Tests for store_short_term_bulk / store_long_term_bulk."""
+
+    def test_short_term_bulk(self, memory):
+        """Bulk short-term writes return one unique id per item."""
+        ids = memory.store_short_term_bulk([("first note", None), ("second note", {"k": 1})])
+        assert len(set(ids)) == 2
+        hits = memory.search_short_term("second")
+        assert [h["text"] for h in hits] == ["second note"]
+        assert hits[0]["metadata"] == {"k": 1}
+
+    def test_long_term_bulk(self, memory):
+        """Bulk long-term writes are searchable."""
+        ids = memory.store_long_term_bulk([(f"fact {i}", {"i": i}) for i in range(10)])
+        assert len(set(ids)) == 10
+        assert len(memory.search_long_term("fact", limit=20)) == 10
+
+    def test_bulk_empty(self, memory):
+        """Empty input stores nothing."""
+        assert memory.store_long_term_bulk([]) == []
+        assert memory.get_all_memories() == []
+
+
+# =============================================================================
+# Long-Term Search Tests
+# =============================================================================
+
+class TestLongTermSearch:
+    """Tests for search_long_term results from the SQLite store."""
+
+    def test_citation_uses_id(self, memory):
+        """Hits cite their record id instead of repeating the text."""
+        ident = memory.store_long_term_bulk([("the capital of France is Paris", None)])[0]
+        hit = memory.search_long_term("Paris")[0]
+        assert hit["text"] == f"the capital of France is Paris (Memory record: {ident})"
+
+    def test_metadata_round_trip(self, memory):
+        """Nested metadata survives the JSON codec, whichever one is installed."""
+        metadata = {"source": "unit", "tags": ["a", "b"], "scores": {"x": 0.5}}
+        memory.store_long_term("round trip metadata", metadata)
+        assert memory.search_long_term("round trip")[0]["metadata"] == metadata
+
+    def test_entity_filter_in_sql(self, memory):
+        """Entities are found even when many plain memories match first."""
+        memory.store_long_term_bulk([(f"kubernetes note {i}", None) for i in range(30)])
+        memory.store_entity("kubernetes", "tool", "container orchestrator", "")
+        hits = memory.search_entity("kubernetes")
+        assert [h["metadata"]["category"] for h in hits] == ["entity"]
+        assert "(Memory record:" not in hits[0]["text"]
+
+    def test_user_filter_in_sql(self, memory):
+        """User memories are restricted to the requested user."""
+        memory.store_user_memory("alice", "alice likes tea")
+        memory.store_user_memory("bob", "bob likes tea")
+        hits = memory.search_user_memory("bob", "likes tea")
+        assert [h["metadata"]["user_id"] for h in hits] == ["bob"]
+
+    def test_quality_filter_in_sql(self, memory):
+        """search_with_quality returns `limit` qualifying hits despite low-quality matches first."""
+        memory.store_long_term_bulk([(f"deploy note {i}", {"quality": 0.2}) for i in range(30)])
+        memory.store_long_term_bulk([(f"deploy guide {i}", {"quality": 0.9}) for i in range(3)])
+        hits = memory.search_with_quality("deploy", min_quality=0.8, limit=3)
+        assert [h["metadata"]["quality"] for h in hits] == [0.9] * 3
+
+    def test_range_filters(self, memory):
+        memory.store_short_term_bulk([(f"step {q}", {"quality": q}) for q in (0.1, 0.5, 0.9)])
+        hits = memory.search_short_term("step", filters={"quality": {"gt": 0.1, "lte": 0.5}})
+        assert [h["metadata"]["quality"] for h in hits] == [0.5]
+        with pytest.raises(ValueError):
+            memory.search_short_term("step", filters={"quality": {"between": 0.5}})
+
+    def test_quality_index_used(self, memory):
+        plan = memory._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM long_mem WHERE quality >= 0.5"
+        ).fetchall()
+        assert "idx_long_mem_quality" in " ".join(str(row[-1]) for row in plan)
+
+    @pytest.mark.parametrize("json1", [True, False])
+    def test_filters_without_generated_columns(self, make_memory, tmp_path, monkeypatch, json1):
+        """Older SQLite builds skip the generated columns and filter with json_extract."""
+        import praisonaiagents.memory.memory as memory_module
+
+        monkeypatch.setattr(memory_module, "_SQLITE_GENERATED_COLUMNS", False)
+        monkeypatch.setattr(memory_module, "_SQLITE_JSON1", json1)
+        monkeypatch.chdir(tmp_path)
+        mem = make_memory()
+        cols = {row[1] for row in mem._conn.execute("PRAGMA table_xinfo(long_mem)")}
+        assert not cols & {"category", "user_id", "quality"}
+        mem.store_long_term_bulk([(f"kubernetes note {i}", {"quality": 0.2}) for i in range(5)])
+        mem.store_entity("kubernetes", "tool", "container orchestrator", "")
+        assert [h["metadata"]["category"] for h in mem.search_entity("kubernetes")] == ["entity"]
+        hits = mem.search_long_term("kubernetes note", filters={"quality": {"lt": 0.5}})
+        assert len(hits) == 5
+        mem.close()
+
+
+class FakeMem0:
+    """mem0 client returning canned hits and recording each search call."""
+
+    def __init__(self, hits):
+        self.hits = hits
+        self.calls = []
+
+    def search(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.hits[:kwargs["limit"]]
+
+
+class TestMem0Search:
+    """Tests for searches routed to a mem0 client."""
+
+    @pytest.fixture
+    def mem0(self, memory):
+        def attach(hits):
+            client = FakeMem0(hits)
+            memory.use_mem0 = True
+            memory.mem0_client = client
+            return client
+        return attach
+
+    def test_entity_filter_over_fetches(self, memory, mem0):
+        """Entities ranked below plain memories still fill the requested limit."""
+        plain = [{"id": f"p{i}", "memory": "note", "metadata": {}} for i in range(15)]
+        entities = [{"id": f"e{i}", "memory": "entity", "metadata": {"category": "entity"}} for i in range(5)]
+        client = mem0(plain + entities)
+        hits = memory.search_entity("kubernetes", limit=5)
+        assert [h["id"] for h in hits] == [f"e{i}" for i in range(5)]
+        assert client.calls[0]["limit"] > 5
+
+    def test_native_filters_passed_through(self, memory, mem0):
+        client = mem0([{"id": "1", "memory": "m", "metadata": {}}])
+        native = {"AND": [{"user_id": "alice"}]}
+        assert memory.search_long_term("q", filters=native)
+        assert memory.search_short_term("q", filters=native)
+        assert [call["filters"] for call in client.calls] == [native, native]
+
+
+# =============================================================================
+# Embedding Cache Tests
+# =============================================================================
+
+class TestEmbeddingCache:
+    """Tests for _get_embeddings batching and caching."""
+
+    def test_misses_fetched_in_one_batch(self, memory, embed_calls):
+        """Distinct misses go out in a single request, duplicates once."""
+        vecs = memory._get_embeddings(["a", "bb", "a"])
+        assert embed_calls == [["a", "bb"]]
+        assert vecs[0] == vecs[2]
+
+    def test_repeat_served_from_cache(self, memory, embed_calls):
+        """A second lookup of the same text makes no API call."""
+        memory._get_embedding("hello")
+        memory._get_embedding("hello")
+        assert len(embed_calls) == 1
+
+    def test_cache_persists_across_instances(self, make_memory, memory, embed_calls):
+        """Embeddings survive in the emb_cache table."""
+        first = memory._get_embedding("persisted")
+        other = make_memory()
+        try:
+            assert other._get_embedding("persisted") == first
+        finally:
+            other.close()
+        assert len(embed_calls) == 1
+
+
+# =============================================================================
+# Embedding Quantization Tests
+# =============================================================================
+
+class TestEmbeddingQuantization:
+    """Tests for the embedding storage codecs."""
+
+    VEC = [0.12, -0.5, 0.031, 0.9, -0.77, 0.0]
+
+    @pytest.mark.parametrize("dtype,size", [("float32", 24), ("float16", 12), ("int8", 10)])
+    def test_encoded_size(self, dtype, size):
+        """Each format uses its documented bytes per dimension."""
+        assert len(_encode_embedding(self.VEC, dtype)) == size
+
+    @pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+    def test_round_trip(self, dtype):
+        """Decoded values stay within quantization error."""
+        decoded = _decode_embedding(_encode_embedding(self.VEC, dtype), dtype)
+        assert decoded == pytest.approx(self.VEC, abs=0.01)
+
+    def test_invalid_quantization(self, make_memory, tmp_path, monkeypatch):
+        """Unknown storage formats are rejected."""
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(ValueError):
+            make_memory(embedding_quantization="int4")
+
+    def test_cache_uses_configured_dtype(self, make_memory, tmp_path, monkeypatch, embed_calls):
+        """Cached embeddings are written in the configured format."""
+        monkeypatch.chdir(tmp_path)
+        mem = make_memory(embedding_quantization="int8")
+        try:
+            mem._get_embedding("quantized")
+            with mem._reader(mem._pool) as conn:
+                assert conn.execute("SELECT dtype FROM emb_cache").fetchone()[0] == "int8"
+        finally:
+            mem.close()
+
+
+# =============================================================================
+# sqlite-vec Search Tests
+# =============================================================================
+
+class TestSqliteVecSearch:
+    """Tests for KNN search through sqlite-vec vec0 tables."""
+
+    AXES = {"python": 0, "cats": 1, "dogs": 2}
+
+    @pytest.fixture
+    def open_memory(self, make_memory, tmp_path, monkeypatch):
+        if not hasattr(sqlite3.Connection, "enable_load_extension"):
+            pytest.skip("Python's sqlite3 cannot load extensions")
+        pytest.importorskip("sqlite_vec")
+
+        def fake_embed_batch(_self, texts):
+            vecs = []
+            for text in texts:
+                vec = [0.0, 0.0, 0.0]
+                for word in text.split():
+                    if word in self.AXES:
+                        vec[self.AXES[word]] += 1.0
+                vecs.append(vec)
+            return vecs
+
+        monkeypatch.setattr(Memory, "_embed_batch", fake_embed_batch)
+        monkeypatch.setattr(Memory, "_get_embedding_dimensions", lambda _self, model: 3)
+        monkeypatch.chdir(tmp_path)
+
+        def open_memory(dtype):
+            mem = make_memory(use_embedding=True, embedding_quantization=dtype)
+            assert mem.use_sqlite_vec
+            return mem
+
+        return open_memory
+
+    @pytest.mark.parametrize("dtype", ["float32", "int8", "float16"])
+    def test_ranks_by_distance(self, open_memory, dtype):
+        mem = open_memory(dtype)
+        mem.store_long_term("cats purr")
+        mem.store_long_term("python snakes")
+        mem.store_long_term_bulk([("dogs bark", None)])
+        hits = mem.search_long_term("python", limit=1)
+        assert hits[0]["text"].startswith("python snakes")
+        assert hits[0]["score"] == pytest.approx(1.0, abs=0.02)
+
+        mem.store_short_term_bulk([("cats purr", None), ("dogs bark", None)])
+        assert mem.search_short_term("dogs", limit=1)[0]["text"] == "dogs bark"
+
+    @pytest.mark.parametrize("dtype", ["float32", "int8", "float16"])
+    def test_filter_join_over_fetches(self, open_memory, dtype):
+        """Filtered neighbours are found even when closer rows are rejected."""
+        mem = open_memory(dtype)
+        mem.store_long_term_bulk([(f"python note {i}", {"quality": 0.2}) for i in range(15)])
+        mem.store_long_term_bulk([(f"python guide {i}", {"quality": 0.9}) for i in range(2)])
+        hits = mem.search_long_term("python", limit=2, filters={"quality": {"gte": 0.8}})
+        assert sorted(h["metadata"]["quality"] for h in hits) == [0.9, 0.9]
+
+    @pytest.mark.parametrize("dtype", ["float32", "int8", "float16"])
+    def test_reopened_table_keeps_element_type(self, open_memory, dtype):
+        mem = open_memory(dtype)
+        mem.store_long_term("cats purr")
+        mem.close()
+
+        reopened = open_memory("float32")
+        assert ("long_vec" in reopened._vec_int8_tables) == (dtype == "int8")
+        hits = reopened.search_long_term("cats", limit=1)
+        assert hits[0]["text"].startswith("cats purr")
+        assert hits[0]["score"] == pytest.approx(1.0, abs=0.02)
+
+
+# =============================================================================
+# NumPy Search Tests
+# =============================================================================
+
+class TestNumpySearch:
+    """Tests for brute-force cosine ranking when sqlite-vec is unavailable."""
+
+    AXES = {"python": 0, "cats": 1, "dogs": 2}
+
+    @pytest.fixture
+    def fake_embeddings(self, tmp_path, monkeypatch):
+        pytest.importorskip("numpy")
+        import praisonaiagents.memory.memory as memory_module
+
+        def fake_embed_batch(_self, texts):
+            vecs = []
+            for text in texts:
+                vec = [0.0, 0.0, 0.0]
+                for word in text.split():
+                    if word in self.AXES:
+                        vec[self.AXES[word]] += 1.0
+                vecs.append(vec)
+            return vecs
+
+        monkeypatch.setattr(memory_module, "SQLITE_VEC_AVAILABLE", False)
+        monkeypatch.setattr(Memory, "_embed_batch", fake_embed_batch)
+        monkeypatch.chdir(tmp_path)
+
+    @pytest.fixture
+    def mem(self, make_memory, fake_embeddings):
+        return make_memory(use_embedding=True)
+
+    def test_ranks_by_cosine(self, mem):
+        """The closest embedding wins regardless of keyword overlap."""
+        assert mem.use_numpy_search
+        mem.store_long_term("cats purr")
+        mem.store_long_term("python snakes")
+        mem.store_long_term_bulk([("dogs bark", None)])
+        hits = mem.search_long_term("python", limit=1)
+        assert len(hits) == 1
+        assert hits[0]["text"].startswith("python snakes")
+        assert hits[0]["score"] == pytest.approx(1.0)
+
+    def test_short_term_ranked(self, mem):
+        """Short-term memories use the same cosine ranking."""
+        mem.store_short_term_bulk([("cats purr", None), ("dogs bark", None)])
+        mem.search_short_term("dogs")
+        mem.store_short_term("python snakes")
+        hits = mem.search_short_term("python", limit=1)
+        assert hits[0]["text"] == "python snakes"
+        assert hits[0]["score"] == pytest.approx(1.0)
+
+    @pytest.mark.parametrize("config", [{"db": ":memory:"}, {"read_pool_size": 1}, {}])
+    def test_new_queries_never_borrow_twice(self, make_memory, fake_embeddings, config):
+        """Concurrent searches for uncached queries must not wait on their own reader."""
+        mem = make_memory(use_embedding=True, **config)
+        mem.store_long_term("cats purr")
+        mem.store_short_term("dogs bark")
+
+        def search(i):
+            mem.search_long_term(f"cats {i}")
+            mem.search_short_term(f"dogs {i}")
+
+        threads = [threading.Thread(target=search, args=(i,), daemon=True) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 10
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        assert not any(thread.is_alive() for thread in threads), "searches deadlocked on the reader pool"
+        mem.close()
+
+    def test_rows_loaded_before_append_not_duplicated(self, mem, monkeypatch):
+        """A search loading the matrix between a store's insert and its append sees each row once."""
+        mem.store_long_term("cats purr")
+        mem.search_long_term("cats")
+        append = Memory._append_emb_matrix
+
+        def racing_append(self, mem_table, idents, embeddings):
+            with self._reader(self._pool) as conn:
+                self._emb_matrices.pop(mem_table)
+                self._load_emb_matrix(conn, mem_table)
+            append(self, mem_table, idents, embeddings)
+
+        monkeypatch.setattr(Memory, "_append_emb_matrix", racing_append)
+        mem.store_long_term("cats nap")
+        ids = mem._emb_matrices["long_mem"][1]
+        assert len(ids) == len(set(ids)) == 2
+        assert len(mem.search_long_term("cats", limit=5)) == 2
+
+    def test_matrix_reloaded_after_reset(self, mem):
+        """Reset drops the cached matrix along with the rows."""
+        mem.store_long_term("cats purr")
+        assert mem.search_long_term("cats")
+        mem.reset_long_term()
+        assert "long_mem" not in mem._emb_matrices
+        assert mem.search_long_term("cats") == []
+
+
+# =============================================================================
+# USearch Backend Tests
+# =============================================================================
+
+class TestUSearchBackend:
+    """Tests for the rag provider backed by a USearch HNSW index."""
+
+    @pytest.fixture
+    def config(self, tmp_path, monkeypatch):
+        pytest.importorskip("usearch")
+
+        def fake_embed_batch(_self, texts):
+            return [[1.0 if word in text.split() else 0.0 for word in ("python", "cats", "dogs")] for text in texts]
+
+        monkeypatch.setattr(Memory, "_embed_batch", fake_embed_batch)
+        monkeypatch.setattr(Memory, "_get_embedding_dimensions", lambda _self, model: 3)
+        monkeypatch.chdir(tmp_path)
+        return {"provider": "rag", "use_embedding": True, "rag_backend": "usearch",
+                "rag_db_path": str(tmp_path / "rag")}
+
+    def test_search_joins_sqlite_content(self, make_memory, config):
+        """Index hits come back with text and metadata from long_mem."""
+        mem = make_memory(**config)
+        try:
+            mem.store_long_term("cats purr", {"source": "test"})
+            mem.store_long_term("python snakes")
+            hits = mem.search_long_term("python", limit=1)
+            assert hits[0]["text"].startswith("python snakes")
+            assert mem.search_long_term("cats", limit=1)[0]["metadata"] == {"source": "test"}
+        finally:
+            mem.close()
+
+    def test_unsaved_vectors_rebuilt_on_open(self, make_memory, config):
+        """Vectors stored after the last save are re-indexed from long_mem."""
+        mem = make_memory(**config)
+        mem.store_long_term("dogs bark")
+        other = make_memory(**config)
+        try:
+            assert len(other._vec.index) == 1
+        finally:
+            other.close()
+            mem.close()
+
+    def test_hnsw_config(self, make_memory, config):
+        """HNSW settings are merged over the defaults and reach the index."""
+        mem = make_memory(hnsw={"M": 32, "search_ef": 100}, **config)
+        try:
+            assert mem.hnsw_config["construction_ef"] == 128
+            assert mem._vec.index.connectivity == 32
+            assert mem._vec.index.expansion_search == 100
+        finally:
+            mem.close()
+
+    def test_invalid_backend(self, make_memory, tmp_path, monkeypatch):
+        """Unknown rag backends are rejected."""
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(ValueError):
+            make_memory(rag_backend="faiss")
+
+
+# =============================================================================
+# Context Building Tests
+# =============================================================================
+
+class TestBuildContext:
+    """Tests for build_context_for_task over the SQLite store."""
+
+    def test_sections_from_shared_search(self, memory):
+        """Entity and user hits are merged into the context block."""
+        memory.store_short_term("deploy notes for kubernetes")
+        memory.store_entity("kubernetes", "tool", "container orchestrator", "")
+        memory.store_user_memory("alice", "alice prefers kubernetes dashboards")
+        context = memory.build_context_for_task("kubernetes", user_id="alice", include_in_output=True)
+        assert "deploy notes for kubernetes" in context
+        assert "container orchestrator" in context
+        assert "alice prefers kubernetes dashboards" in context
+
+
+# =============================================================================
+# Identifier Tests
+# =============================================================================
+
+class TestIdentifiers:
+    """Tests for integer row ids and their hex form."""
+
+    def test_hex_ids_over_integer_rowid(self, memory):
+        """Returned ids are 16-char hex strings of the stored integer key."""
+        ident = memory.store_long_term_bulk([("stored once", None)])[0]
+        assert len(ident) == 16
+        with memory._reader(memory._pool) as conn:
+            assert conn.execute("SELECT id FROM long_mem").fetchone()[0] == int(ident, 16)
+        assert memory.search_long_term("stored")[0]["id"] == ident
+
+    def test_text_ids_migrated(self, make_memory, tmp_path, monkeypatch):
+        """Tables from before integer ids keep their rows under the same number."""
+        monkeypatch.chdir(tmp_path)
+        conn = sqlite3.connect(tmp_path / "long.db")
+        conn.execute("CREATE TABLE long_mem (id TEXT PRIMARY KEY, content TEXT, meta TEXT, created_at REAL)")
+        conn.execute("INSERT INTO long_mem VALUES ('1700000000000000000', 'legacy row', '{}', 1.0)")
+        conn.commit()
+        conn.close()
+
+        mem = make_memory(db=str(tmp_path / "long.db"))
+        try:
+            hit = mem.search_long_term("legacy")[0]
+            assert hit["id"] == f"{1700000000000000000:016x}"
+            with mem._reader(mem._pool) as reader:
+                assert "long_mem_old" not in {
+                    row[0] for row in reader.execute("SELECT name FROM sqlite_master")
+                }
+        finally:
+            mem.close()
+
+
+# =============================================================================
+# Single Database Tests
+# =============================================================================
+
+class TestSingleDatabase:
+    """Tests for the shared memory DB and import of the legacy per-tier files."""
+
+    def test_legacy_files_imported_once(self, make_memory, tmp_path, monkeypatch):
+        """Rows from short_db/long_db move into db and the old files are renamed."""
+        monkeypatch.chdir(tmp_path)
+        for name, table in (("short.db", "short_mem"), ("long.db", "long_mem")):
+            conn = sqlite3.connect(tmp_path / name)
+            conn.execute(f"CREATE TABLE {table} (id TEXT PRIMARY KEY, content TEXT, meta TEXT, created_at REAL)")
+            conn.execute(f"INSERT INTO {table} VALUES ('1700000000000000000', 'old {table}', '{{}}', 1.0)")
+            conn.commit()
+            conn.close()
+        config = {"short_db": str(tmp_path / "short.db"), "long_db": str(tmp_path / "long.db")}
+
+        mem = make_memory(**config)
+        try:
+            assert mem.search_short_term("old short_mem")
+            assert mem.search_long_term("old long_mem")
+        finally:
+            mem.close()
+        assert not (tmp_path / "long.db").exists()
+        assert (tmp_path / "long.db.migrated").exists()
+
+    @staticmethod
+    def write_legacy(path, table):
+        path.parent.mkdir(exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute(f"CREATE TABLE {table} (id TEXT PRIMARY KEY, content TEXT, meta TEXT, created_at REAL)")
+        conn.execute(f"INSERT INTO {table} VALUES ('1700000000000000000', 'old {table}', '{{}}', 1.0)")
+        conn.commit()
+        conn.close()
+
+    @pytest.mark.parametrize("db", [":memory:", "other/memory.db"])
+    def test_default_legacy_files_left_for_default_db(self, make_memory, tmp_path, monkeypatch, db):
+        """Only the default db imports .praison/short_term.db and long_term.db."""
+        monkeypatch.chdir(tmp_path)
+        self.write_legacy(tmp_path / ".praison" / "short_term.db", "short_mem")
+        self.write_legacy(tmp_path / ".praison" / "long_term.db", "long_mem")
+        mem = make_memory(db=db if db == ":memory:" else str(tmp_path / db))
+        try:
+            assert mem.search_long_term("old long_mem") == []
+        finally:
+            mem.close()
+        assert (tmp_path / ".praison" / "short_term.db").exists()
+        assert (tmp_path / ".praison" / "long_term.db").exists()
+
+        mem = Memory({"provider": "none"})
+        try:
+            assert mem.db == ".praison/memory.db"
+            assert mem.search_long_term("old long_mem")
+        finally:
+            mem.close()
+        assert (tmp_path / ".praison" / "long_term.db.migrated").exists()
+
+    def test_db_derived_from_legacy_paths(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self.write_legacy(tmp_path / "data" / "long.db", "long_mem")
+        mem = Memory({"provider": "none", "long_db": str(tmp_path / "data" / "long.db")})
+        try:
+            assert mem.db == str(tmp_path / "data" / "memory.db")
+            assert mem.search_long_term("old long_mem")
+        finally:
+            mem.close()
+
+    def test_search_combined(self, memory):
+        """One query returns matching short- and long-term rows, tagged by tier."""
+        memory.store_short_term("combined short note")
+        memory.store_long_term_bulk([(f"combined long note {i}", None) for i in range(5)])
+        hits = memory.search_combined("combined", limit=3)
+        assert [h["type"] for h in hits] == ["short_term"] + ["long_term"] * 3
+        assert "(Memory record:" in hits[1]["text"]
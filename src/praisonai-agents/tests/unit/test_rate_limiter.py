@@ -218,6 +218,25 @@ class TestRateLimiterConfiguration:
             tokens_per_minute=100000
         )
         assert limiter is not None
+    
+    def test_rate_limiter_tpm_blocks_when_exceeded(self):
+        """Requests should wait once the tokens_per_minute budget is spent."""
+        from praisonaiagents.llm import RateLimiter
+        
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=6000, burst=10)
+        
+        mock_time = [0.0]
+        limiter._get_time = lambda: mock_time[0]
+        limiter._sleep = lambda s: mock_time.__setitem__(0, mock_time[0] + s)
+        limiter._last_update = 0.0
+        
+        # The whole minute's budget is available up front
+        limiter.acquire(tokens=6000)
+        assert mock_time[0] == 0.0
+        
+        # 1000 more tokens refill at 100 tokens/second
+        limiter.acquire(tokens=1000)
+        assert mock_time[0] == pytest.approx(10.0)
 
 
 class TestRateLimiterDeterministic: